@@ -9,18 +9,34 @@ Can be run independently or as part of a processing pipeline.
 Usage:
     python 03_noisegate.py --input input.wav --output output.wav --threshold -25.0
     python 03_noisegate.py --config config.py --input-dir input/ --output-dir output/
+    python 03_noisegate.py --input input.wav --output output.wav --control-hop 128
+    python 03_noisegate.py --input long.wav --output gated.wav --stream-block-size 65536
+    python 03_noisegate.py --input long.mp3 --output gated.wav --threshold -30 --envelope-cache .envelope_cache
+    python 03_noisegate.py --input long.mp3 --threshold-sweep=-45:-20:2.5 --ratio-sweep 1,4,10
+    python 03_noisegate.py --input input.wav --output output.wav --auto-threshold
 """
 
 import argparse
 import logging
+import sys
 import time
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Sequence
 import numpy as np
 import librosa
 import soundfile as sf
 from tqdm import tqdm
 
+# Shared DSP kernels live in src/audio (repo root is two levels up)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.audio.gate_kernel import (
+    asymmetric_one_pole, interpolate_control, hop_coefficient, control_rate_error_bound
+)
+from src.audio.envelope import EnvelopeDetector
+from src.audio.envelope_cache import EnvelopeCache
+from src.audio.auto_threshold import EnvelopeHistogram
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,17 +44,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Control hop used by threshold sweeps when the gate runs per sample
+SWEEP_CONTROL_HOP = 128
+
+# Envelope percentile marking the noise-floor regions scored by a sweep
+SWEEP_NOISE_FLOOR_PERCENTILE = 20
+
+# Block size for streaming several files as channels when stream_block_size is unset
+CHANNEL_STREAM_BLOCK_SIZE = 1 << 16
+
 class NoiseGateProcessor:
     """Standalone noise gate processor."""
     
     def __init__(self, threshold_db: float = -25.0, attack_ms: float = 10.0, 
-                 release_ms: float = 500.0, ratio: float = 10.0):
-        """Initialize noise gate with parameters."""
+                 release_ms: float = 500.0, ratio: float = 10.0,
+                 control_hop: Optional[int] = None, envelope_mode: str = "rms",
+                 stream_block_size: Optional[int] = None,
+                 channel_thresholds_db: Optional[Sequence[float]] = None,
+                 envelope_cache: Optional[EnvelopeCache] = None,
+                 auto_threshold: bool = False):
+        """
+        Initialize noise gate with parameters.
+        
+        control_hop enables control-rate mode: gain and smoothing are computed
+        once every control_hop samples and linearly interpolated back to audio
+        rate. Between threshold crossings the gain differs from the
+        per-sample path by at most control_rate_error_bound(attack, release,
+        hop), roughly (hop / min(attack, release))**2 / 8 with times in
+        samples - e.g. under 0.001 for hop=64 with a 20 ms attack at 44.1 kHz;
+        at a crossing the gain ramp starts up to one hop late.
+        None (default) keeps the exact per-sample path.
+        
+        envelope_mode selects the level detector ("rms", "exp_rms" or "peak").
+        
+        stream_block_size makes process_file read, gate and write the file in
+        blocks of that many samples, keeping memory constant for any length.
+        
+        apply_noise_gate also accepts a (channels, samples) array and gates all
+        channels in one call; channel_thresholds_db then gives one threshold
+        per channel (threshold_db is used when it is None).
+        
+        envelope_cache keeps each input's envelope on disk, so re-running
+        process_file with a different threshold, attack, release or ratio skips
+        the envelope analysis (not used in streaming mode). With a cache, the
+        gate always uses the cached (decimated and interpolated) envelope,
+        whether the entry was just written or read back.
+        
+        auto_threshold estimates the threshold per channel from a dB histogram
+        of the envelope (noise floor and speech percentiles) instead of using
+        threshold_db / channel_thresholds_db. Streaming mode reads the file
+        twice: once for the histogram, once to gate.
+        """
         self.threshold_db = threshold_db
         self.attack_ms = attack_ms
         self.release_ms = release_ms
         self.ratio = ratio
+        self.control_hop = control_hop if control_hop and control_hop > 1 else None
+        self.envelope_mode = envelope_mode
+        self.stream_block_size = stream_block_size
+        self.channel_thresholds_db = channel_thresholds_db
+        self.envelope_cache = envelope_cache
+        self.auto_threshold = auto_threshold
         logger.info(f"Noise gate initialized: threshold={threshold_db}dB, attack={attack_ms}ms, release={release_ms}ms")
+        if self.control_hop:
+            logger.info(f"Control-rate gain enabled: hop={self.control_hop} samples")
     
     def load_audio(self, file_path: Path) -> Tuple[np.ndarray, int]:
         """Load audio file using librosa."""
@@ -50,51 +119,19 @@ class NoiseGateProcessor:
             logger.error(f"Error loading {file_path}: {e}")
             raise
     
-    def apply_noise_gate(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
-        """Apply noise gate to audio."""
+    def apply_noise_gate(self, audio: np.ndarray, sample_rate: int,
+                         envelope: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply noise gate to audio (envelope: precomputed level, e.g. from the cache)."""
         try:
-            # Convert threshold from dB to amplitude
-            threshold_amp = 10 ** (self.threshold_db / 20)
-            
-            # Convert time parameters to samples
-            attack_samples = int(self.attack_ms * sample_rate / 1000)
-            release_samples = int(self.release_ms * sample_rate / 1000)
+            threshold_amp = None
+            if self.auto_threshold:
+                if envelope is None:
+                    envelope = EnvelopeDetector(self.envelope_mode, gate_window_size(audio.shape[-1])).process(audio)
+                threshold_amp = self._auto_threshold_amp(EnvelopeHistogram().update(envelope))
             
-            # Calculate RMS envelope
-            window_size = min(1024, len(audio) // 10)  # Adaptive window size
-            rms = np.sqrt(np.convolve(audio ** 2, np.ones(window_size) / window_size, mode='same'))
-            
-            # Calculate gain reduction
-            gain_reduction = np.ones_like(audio)
-            
-            # Apply threshold
-            below_threshold = rms < threshold_amp
-            
-            # Calculate gain reduction based on ratio
-            if self.ratio > 1:
-                # Soft knee compression
-                gain_reduction[below_threshold] = (rms[below_threshold] / threshold_amp) ** (1 / self.ratio)
-            else:
-                # Hard gate
-                gain_reduction[below_threshold] = 0.0
-            
-            # Apply attack and release smoothing
-            smoothed_gain = np.ones_like(gain_reduction)
-            
-            # Forward pass (attack)
-            for i in range(1, len(smoothed_gain)):
-                if gain_reduction[i] < smoothed_gain[i-1]:
-                    # Attack phase
-                    smoothed_gain[i] = smoothed_gain[i-1] - (smoothed_gain[i-1] - gain_reduction[i]) / attack_samples
-                else:
-                    # Release phase
-                    smoothed_gain[i] = smoothed_gain[i-1] + (gain_reduction[i] - smoothed_gain[i-1]) / release_samples
-            
-            # Apply gain reduction
-            gated_audio = audio * smoothed_gain
-            
-            # Clip to prevent overflow
-            gated_audio = np.clip(gated_audio, -1.0, 1.0)
+            # Whole signal as a single final block
+            stream = NoiseGateStream(self, sample_rate, audio.shape[-1], threshold_amp)
+            gated_audio = stream.process(audio, final=True, envelope=envelope)
             
             logger.debug(f"Noise gate applied: threshold={self.threshold_db}dB, ratio={self.ratio}")
             return gated_audio
@@ -103,6 +140,167 @@ class NoiseGateProcessor:
             logger.error(f"Error applying noise gate: {e}")
             return audio
     
+    def cached_envelope(self, input_file: Path, audio: np.ndarray) -> Optional[np.ndarray]:
+        """Envelope of a loaded file from the cache, computing and storing it on a miss."""
+        if self.envelope_cache is None:
+            return None
+        
+        try:
+            window_size = gate_window_size(audio.shape[-1])
+            key = self.envelope_cache.key(EnvelopeCache.file_hash(input_file), window_size, self.envelope_mode)
+            envelope = self.envelope_cache.load(key, audio.shape[-1])
+            if envelope is not None:
+                logger.info(f"Using cached envelope for {input_file.name}")
+                return envelope
+            
+            # Gate with the cached form on a miss too, so every run with these settings matches
+            envelope = EnvelopeDetector(self.envelope_mode, window_size).process(audio)
+            return self.envelope_cache.store(key, envelope)
+            
+        except Exception as e:
+            logger.warning(f"Envelope cache unavailable for {input_file.name}: {e}")
+            return None
+    
+    def _threshold_amp(self, audio: np.ndarray) -> np.ndarray:
+        """Linear threshold for the audio: a scalar, or one per channel (as a column)."""
+        if audio.ndim == 1 or self.channel_thresholds_db is None:
+            return np.asarray(10 ** (self.threshold_db / 20))
+        
+        channels = audio.shape[0]
+        thresholds_db = np.asarray(self.channel_thresholds_db, dtype=np.float64)
+        if len(thresholds_db) != channels:
+            logger.warning(f"Got {len(thresholds_db)} channel thresholds for {channels} channels, "
+                           f"using {self.threshold_db}dB for all")
+            thresholds_db = np.full(channels, self.threshold_db)
+        return 10 ** (thresholds_db[:, np.newaxis] / 20)
+    
+    def _auto_threshold_amp(self, histogram: EnvelopeHistogram) -> np.ndarray:
+        """Linear threshold estimated from an envelope histogram (scalar, or one per channel as a column)."""
+        threshold_db, noise_floor_db, speech_db = histogram.estimate_threshold_db(fallback_db=self.threshold_db)
+        for channel, (threshold, noise, speech, audible) in enumerate(zip(np.atleast_1d(threshold_db),
+                                                                          np.atleast_1d(noise_floor_db),
+                                                                          np.atleast_1d(speech_db),
+                                                                          np.atleast_1d(histogram.audible()))):
+            if not audible:
+                logger.info(f"Auto threshold (channel {channel}): nothing audible, using {threshold:.1f}dB")
+                continue
+            logger.info(f"Auto threshold (channel {channel}): {threshold:.1f}dB "
+                        f"(noise floor {noise:.1f}dB, speech {speech:.1f}dB)")
+        
+        threshold_amp = 10 ** (np.asarray(threshold_db) / 20)
+        return threshold_amp[:, np.newaxis] if threshold_amp.ndim else threshold_amp
+    
+    def _gain_from_rms(self, rms: np.ndarray, threshold_amp: np.ndarray,
+                       ratio: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculate target gain reduction from the RMS envelope (ratio: optional per-row column)."""
+        gain_reduction = np.ones_like(rms)
+        
+        # Apply threshold
+        below_threshold = rms < threshold_amp
+        
+        if ratio is not None:
+            # One ratio per row: soft knee where ratio > 1, hard gate elsewhere
+            ratio = np.broadcast_to(np.asarray(ratio, dtype=np.float64), rms.shape)[below_threshold]
+            threshold_below = np.broadcast_to(threshold_amp, rms.shape)[below_threshold]
+            soft = (rms[below_threshold] / threshold_below) ** (1 / np.maximum(ratio, 1.0))
+            gain_reduction[below_threshold] = np.where(ratio > 1, soft, 0.0)
+            return gain_reduction
+        
+        # Calculate gain reduction based on ratio
+        if self.ratio > 1:
+            # Soft knee compression
+            threshold_below = np.broadcast_to(threshold_amp, rms.shape)[below_threshold]
+            gain_reduction[below_threshold] = (rms[below_threshold] / threshold_below) ** (1 / self.ratio)
+        else:
+            # Hard gate
+            gain_reduction[below_threshold] = 0.0
+        
+        return gain_reduction
+    
+    def sweep(self, audio: np.ndarray, sample_rate: int, thresholds_db: Sequence[float],
+              ratios: Optional[Sequence[float]] = None,
+              envelope: Optional[np.ndarray] = None) -> Tuple[list, np.ndarray, np.ndarray]:
+        """
+        Evaluate many threshold/ratio combinations from one envelope pass.
+        
+        All combinations are gated together as rows of one control-rate
+        batch (control_hop, or SWEEP_CONTROL_HOP for per-sample gates), so the
+        cost of each extra combination is a fraction of the envelope pass.
+        
+        Returns:
+            (results, points, gains): one dict per combination with
+            threshold_db, ratio, open_percent and residual_noise_db, the
+            control point positions, and the smoothed gain per combination
+            at those points (rows in results order)
+        """
+        ratios = [self.ratio] if not ratios else list(ratios)
+        combos = [(threshold, ratio) for ratio in ratios for threshold in thresholds_db]
+        
+        hop = self.control_hop or SWEEP_CONTROL_HOP
+        if envelope is None:
+            envelope = EnvelopeDetector(self.envelope_mode, gate_window_size(len(audio))).process(audio)
+        points = np.arange(0, len(audio), hop)
+        rms = envelope[points]
+        
+        # One row per combination
+        threshold_amp = 10 ** (np.array([[threshold] for threshold, _ in combos]) / 20)
+        ratio = np.array([[ratio] for _, ratio in combos])
+        target = self._gain_from_rms(np.broadcast_to(rms, (len(combos), len(rms))), threshold_amp, ratio)
+        target[:, 0] = 1.0  # First control point stays fully open
+        
+        attack_samples = int(self.attack_ms * sample_rate / 1000)
+        release_samples = int(self.release_ms * sample_rate / 1000)
+        gains = asymmetric_one_pole(target, hop_coefficient(attack_samples, hop),
+                                    hop_coefficient(release_samples, hop))
+        
+        # Score against the same noise-floor regions for every combination
+        noise_floor = rms <= np.percentile(rms, SWEEP_NOISE_FLOOR_PERCENTILE)
+        residual = np.mean((gains[:, noise_floor] * rms[noise_floor]) ** 2, axis=1)
+        open_percent = 100 * np.mean(gains >= 0.5, axis=1)
+        
+        results = [
+            {
+                "threshold_db": float(threshold),
+                "ratio": float(ratio),
+                "open_percent": float(open_percent[row]),
+                "residual_noise_db": float(10 * np.log10(residual[row] + 1e-12)),
+            }
+            for row, (threshold, ratio) in enumerate(combos)
+        ]
+        return results, points, gains
+    
+    def sweep_file(self, input_file: Path, thresholds_db: Sequence[float],
+                   ratios: Optional[Sequence[float]] = None, excerpt_dir: Optional[Path] = None,
+                   excerpt_start: float = 0.0, excerpt_seconds: float = 30.0) -> list:
+        """Run a threshold sweep on a file, log a report and optionally render excerpts."""
+        start_time = time.time()
+        
+        audio, sample_rate = self.load_audio(input_file)
+        envelope = self.cached_envelope(input_file, audio)
+        results, points, gains = self.sweep(audio, sample_rate, thresholds_db, ratios, envelope)
+        
+        logger.info(f"Threshold sweep: {input_file.name} ({len(results)} combinations, "
+                    f"{time.time() - start_time:.2f}s)")
+        logger.info(f"{'threshold':>10} {'ratio':>6} {'open %':>7} {'residual noise':>15}")
+        for result in results:
+            logger.info(f"{result['threshold_db']:>8.1f}dB {result['ratio']:>6.1f} "
+                        f"{result['open_percent']:>7.1f} {result['residual_noise_db']:>13.1f}dB")
+        
+        if excerpt_dir:
+            excerpt_dir.mkdir(parents=True, exist_ok=True)
+            first = min(len(audio), int(excerpt_start * sample_rate))
+            last = min(len(audio), first + int(excerpt_seconds * sample_rate))
+            positions = np.arange(first, last)
+            for result, gain in zip(results, gains):
+                excerpt = audio[first:last] * np.interp(positions, points, gain)
+                np.clip(excerpt, -1.0, 1.0, out=excerpt)
+                excerpt_name = (f"{input_file.stem}_t{result['threshold_db']:g}dB"
+                                f"_r{result['ratio']:g}.wav")
+                self.save_audio(excerpt, sample_rate, excerpt_dir / excerpt_name)
+            logger.info(f"Sweep excerpts saved to {excerpt_dir}")
+        
+        return results
+    
     def save_audio(self, audio: np.ndarray, sample_rate: int, output_path: Path) -> None:
         """Save audio to file."""
         try:
@@ -112,6 +310,86 @@ class NoiseGateProcessor:
             logger.error(f"Error saving {output_path}: {e}")
             raise
     
+    def _mono_blocks(self, source: sf.SoundFile, block_size: Optional[int] = None):
+        """Yield (mono block, is_last) pairs from an open sound file."""
+        blocks = source.blocks(blocksize=block_size or self.stream_block_size, dtype='float32', always_2d=True)
+        block = next(blocks, None)
+        while block is not None:
+            # Read one block ahead so the last block can flush
+            next_block = next(blocks, None)
+            yield (block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]), next_block is None
+            block = next_block
+    
+    def stream_file(self, input_file: Path, output_file: Path) -> None:
+        """Gate a file block by block, writing each gated block straight to the output."""
+        with sf.SoundFile(str(input_file)) as source:
+            sample_rate = source.samplerate
+            
+            threshold_amp = None
+            if self.auto_threshold:
+                # First pass: envelope histogram only
+                detector = EnvelopeDetector(self.envelope_mode, gate_window_size(source.frames))
+                histogram = EnvelopeHistogram()
+                for mono, last in self._mono_blocks(source):
+                    histogram.update(detector.process_block(mono, final=last))
+                threshold_amp = self._auto_threshold_amp(histogram)
+                source.seek(0)
+            
+            stream = NoiseGateStream(self, sample_rate, source.frames, threshold_amp)
+            with sf.SoundFile(str(output_file), 'w', samplerate=sample_rate, channels=1) as sink:
+                for mono, last in self._mono_blocks(source):
+                    sink.write(stream.process(mono, final=last))
+    
+    def stream_channels(self, input_files: Sequence[Path]) -> Tuple[list, int]:
+        """
+        Gate equal-length files as the channels of one signal, block by block.
+        
+        Each step stacks one block of every file into a (channels, block)
+        array, so besides the gated output only a block per channel is held
+        in memory, and no channel is padded. channel_thresholds_db applies in
+        input_files order.
+        
+        Returns:
+            (gated channels, sample rate)
+        
+        Raises:
+            ValueError: if the files differ in sample rate or length
+        """
+        block_size = self.stream_block_size or CHANNEL_STREAM_BLOCK_SIZE
+        with ExitStack() as stack:
+            sources = [stack.enter_context(sf.SoundFile(str(input_file))) for input_file in input_files]
+            sample_rates = {source.samplerate for source in sources}
+            lengths = {source.frames for source in sources}
+            if len(sample_rates) > 1 or len(lengths) > 1:
+                raise ValueError(f"channels differ in sample rate or length ({sorted(sample_rates)} Hz, "
+                                 f"{sorted(lengths)} samples)")
+            sample_rate, frames = sample_rates.pop(), lengths.pop()
+            
+            def session_blocks():
+                for blocks in zip(*(self._mono_blocks(source, block_size) for source in sources)):
+                    yield np.stack([block for block, _ in blocks]), blocks[0][1]
+            
+            threshold_amp = None
+            if self.auto_threshold:
+                # First pass: per-channel envelope histograms only
+                detector = EnvelopeDetector(self.envelope_mode, gate_window_size(frames))
+                histogram = EnvelopeHistogram()
+                for block, last in session_blocks():
+                    histogram.update(detector.process_block(block, final=last))
+                threshold_amp = self._auto_threshold_amp(histogram)
+                for source in sources:
+                    source.seek(0)
+            
+            stream = NoiseGateStream(self, sample_rate, frames, threshold_amp)
+            gated = np.empty((len(sources), frames), dtype=np.float32)
+            position = 0
+            for block, last in session_blocks():
+                gated_block = stream.process(block, final=last)
+                gated[:, position:position + gated_block.shape[-1]] = gated_block
+                position += gated_block.shape[-1]
+        
+        return list(gated), sample_rate
+    
     def process_file(self, input_file: Path, output_file: Path) -> bool:
         """Process single file: Load → Noise Gate → Save."""
         start_time = time.time()
@@ -119,14 +397,19 @@ class NoiseGateProcessor:
         try:
             logger.info(f"Applying noise gate: {input_file.name}")
             
-            # Load audio
-            audio, sample_rate = self.load_audio(input_file)
-            
-            # Apply noise gate
-            gated_audio = self.apply_noise_gate(audio, sample_rate)
-            
-            # Save
-            self.save_audio(gated_audio, sample_rate, output_file)
+            if self.stream_block_size:
+                # Constant memory: read, gate and write one block at a time
+                self.stream_file(input_file, output_file)
+            else:
+                # Load audio
+                audio, sample_rate = self.load_audio(input_file)
+                
+                # Apply noise gate (envelope reused from the cache when available)
+                envelope = self.cached_envelope(input_file, audio)
+                gated_audio = self.apply_noise_gate(audio, sample_rate, envelope)
+                
+                # Save
+                self.save_audio(gated_audio, sample_rate, output_file)
             
             processing_time = time.time() - start_time
             logger.info(f"Completed: {output_file.name} ({processing_time:.2f}s)")
@@ -138,6 +421,135 @@ class NoiseGateProcessor:
             logger.error(f"Error processing {input_file.name}: {str(e)}")
             return False
 
+class NoiseGateStream:
+    """Noise gate state for one signal, carried across blocks."""
+    
+    def __init__(self, processor: NoiseGateProcessor, sample_rate: int, total_samples: int,
+                 threshold_amp: Optional[np.ndarray] = None):
+        """
+        Initialize gate state.
+        
+        total_samples sets the adaptive RMS window, so feeding a signal block
+        by block gives the same result as gating it in one call. Blocks are
+        1-D, or (channels, samples) with time along the last axis.
+        threshold_amp overrides the processor's configured threshold.
+        """
+        self.processor = processor
+        self.threshold_amp = threshold_amp  # None: set from the first block's shape
+        
+        # Convert time parameters to samples
+        attack_samples = int(processor.attack_ms * sample_rate / 1000)
+        release_samples = int(processor.release_ms * sample_rate / 1000)
+        
+        # Smoothing coefficients per sample or per control hop
+        self.hop = processor.control_hop
+        if self.hop:
+            self.attack_coeff = hop_coefficient(attack_samples, self.hop)
+            self.release_coeff = hop_coefficient(release_samples, self.hop)
+            logger.debug(f"Control-rate gain error bound: "
+                         f"{control_rate_error_bound(attack_samples, release_samples, self.hop):.4f}")
+        else:
+            self.attack_coeff = 1.0 / max(1, attack_samples)
+            self.release_coeff = 1.0 / max(1, release_samples)
+        
+        self.detector = EnvelopeDetector(processor.envelope_mode, gate_window_size(total_samples))
+        
+        self.position = 0          # Next sample to be gated
+        self.envelope_end = 0      # Samples whose envelope is known
+        self.smoothed = 1.0        # Smoother state (gate starts fully open)
+        self.hop_point = None      # Last control point and its smoothed gain
+        self.hop_value = None
+        self.pending = None        # Audio waiting for its gain
+    
+    def process(self, block: np.ndarray, final: bool = False,
+                envelope: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Gate the next block of audio.
+        
+        Output lags the input by the envelope look-ahead (and one control hop
+        in control-rate mode); final=True flushes everything still pending.
+        A precomputed envelope for the block (same shape) skips the detector.
+        """
+        if self.threshold_amp is None:
+            self.threshold_amp = self.processor._threshold_amp(block)
+        
+        if self.pending is None or self.pending.shape[-1] == 0:
+            self.pending = block
+        else:
+            self.pending = np.concatenate((self.pending, block), axis=-1)
+        
+        rms = self.detector.process_block(block, final) if envelope is None else envelope
+        if self.hop:
+            gain = self._control_rate_gain(rms, final)
+        else:
+            gain = self._sample_rate_gain(rms)
+        
+        # Apply gain reduction to the samples it covers
+        ready = gain.shape[-1]
+        gated_audio = self.pending[..., :ready] * gain
+        self.pending = self.pending[..., ready:]
+        self.position += ready
+        
+        # Clip to prevent overflow
+        np.clip(gated_audio, -1.0, 1.0, out=gated_audio)
+        return gated_audio
+    
+    def _sample_rate_gain(self, rms: np.ndarray) -> np.ndarray:
+        """Smooth the gain one sample at a time."""
+        target = self.processor._gain_from_rms(rms, self.threshold_amp)
+        if self.envelope_end == 0 and target.shape[-1]:
+            target[..., 0] = 1.0  # First sample stays fully open
+        self.envelope_end += rms.shape[-1]
+        
+        gain = asymmetric_one_pole(target, self.attack_coeff, self.release_coeff, self.smoothed)
+        if gain.shape[-1]:
+            self.smoothed = gain[..., -1]
+        return gain
+    
+    def _control_rate_gain(self, rms: np.ndarray, final: bool) -> np.ndarray:
+        """Smooth the gain once per hop and interpolate it back to audio rate."""
+        start = self.envelope_end
+        self.envelope_end += rms.shape[-1]
+        
+        # Control points (multiples of hop) inside this envelope block
+        first_point = -(-start // self.hop) * self.hop
+        points = np.arange(first_point, self.envelope_end, self.hop)
+        target = self.processor._gain_from_rms(rms[..., points - start], self.threshold_amp)
+        if start == 0 and len(points):
+            target[..., 0] = 1.0  # First control point stays fully open
+        
+        values = asymmetric_one_pole(target, self.attack_coeff, self.release_coeff, self.smoothed)
+        if len(points):
+            self.smoothed = values[..., -1]
+        
+        # Interpolate from the previous block's last control point onwards
+        if self.hop_point is not None:
+            points = np.concatenate(([self.hop_point], points))
+            values = np.concatenate((self.hop_value[..., np.newaxis], values), axis=-1)
+        if len(points) == 0:
+            return np.zeros(rms.shape[:-1] + (0,))
+        
+        # Samples after the last control point wait for the next one
+        stop = self.envelope_end if final else points[-1]
+        gain = interpolate_control(np.arange(self.position, stop), points, values)
+        self.hop_point, self.hop_value = points[-1], values[..., -1]
+        return gain
+
+def parse_sweep_range(spec: str) -> list:
+    """Parse START:STOP:STEP (STOP included) or a comma-separated list of values."""
+    if ':' not in spec:
+        return [float(value) for value in spec.split(',')]
+    
+    start, stop, step = (float(value) for value in spec.split(':'))
+    if step == 0 or (stop - start) / step < 0:
+        raise ValueError(f"Invalid sweep range '{spec}'")
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return [round(start + i * step, 6) for i in range(count)]
+
+def gate_window_size(total_samples: int) -> int:
+    """Adaptive RMS window size for a signal length."""
+    return min(1024, total_samples // 10)
+
 def get_audio_files(directory: Path) -> list:
     """Get all audio files from directory."""
     supported_formats = {'.wav', '.mp3', '.m4a', '.flac', '.aac', '.ogg'}
@@ -164,6 +576,12 @@ def load_config(config_path: Optional[Path] = None) -> dict:
             "NOISE_GATE_ATTACK_MS": 10.0,
             "NOISE_GATE_RELEASE_MS": 500.0,
             "NOISE_GATE_RATIO": 10.0,
+            "NOISE_GATE_CONTROL_HOP": None,
+            "GATE_ENVELOPE_MODE": "rms",
+            "NOISE_GATE_STREAM_BLOCK_SIZE": None,
+            "ENVELOPE_CACHE_DIR": None,
+            "ENVELOPE_CACHE_MAX_MB": 512,
+            "NOISE_GATE_AUTO_THRESHOLD": False,
             "INPUT_DIRECTORY": "input",
             "OUTPUT_DIRECTORY": "output",
             "OUTPUT_FILE_PREFIX": "gated_"
@@ -181,6 +599,17 @@ def main():
     parser.add_argument("--attack", type=float, help="Attack time in milliseconds")
     parser.add_argument("--release", type=float, help="Release time in milliseconds")
     parser.add_argument("--ratio", type=float, help="Gate ratio (1.0 = hard gate, >1.0 = soft gate)")
+    parser.add_argument("--control-hop", type=int, help="Compute gain every N samples (e.g. 32-256) instead of per sample")
+    parser.add_argument("--envelope-mode", choices=["rms", "exp_rms", "peak"], help="Level detector used by the gate")
+    parser.add_argument("--stream-block-size", type=int, help="Stream files in blocks of N samples (constant memory)")
+    parser.add_argument("--envelope-cache", type=Path, help="Directory for cached envelopes (fast threshold retuning)")
+    parser.add_argument("--envelope-cache-mb", type=float, help="Envelope cache size cap in MB (least recently used evicted)")
+    parser.add_argument("--auto-threshold", action="store_true", help="Estimate the threshold from the envelope histogram")
+    parser.add_argument("--threshold-sweep", help="Report gate stats for thresholds START:STOP:STEP, e.g. --threshold-sweep=-45:-20:2.5")
+    parser.add_argument("--ratio-sweep", help="Ratios to combine with the threshold sweep, e.g. 1,4,10")
+    parser.add_argument("--sweep-excerpt-dir", type=Path, help="Render a gated excerpt per sweep combination here")
+    parser.add_argument("--sweep-excerpt-start", type=float, default=0.0, help="Excerpt start in seconds")
+    parser.add_argument("--sweep-excerpt-seconds", type=float, default=30.0, help="Excerpt length in seconds")
     
     args = parser.parse_args()
     
@@ -196,15 +625,48 @@ def main():
         config["NOISE_GATE_RELEASE_MS"] = args.release
     if args.ratio is not None:
         config["NOISE_GATE_RATIO"] = args.ratio
+    if args.control_hop is not None:
+        config["NOISE_GATE_CONTROL_HOP"] = args.control_hop
+    if args.envelope_mode is not None:
+        config["GATE_ENVELOPE_MODE"] = args.envelope_mode
+    if args.stream_block_size is not None:
+        config["NOISE_GATE_STREAM_BLOCK_SIZE"] = args.stream_block_size
+    if args.envelope_cache is not None:
+        config["ENVELOPE_CACHE_DIR"] = args.envelope_cache
+    if args.envelope_cache_mb is not None:
+        config["ENVELOPE_CACHE_MAX_MB"] = args.envelope_cache_mb
+    if args.auto_threshold:
+        config["NOISE_GATE_AUTO_THRESHOLD"] = True
+    
+    # Envelope cache (optional)
+    envelope_cache = None
+    if config.get("ENVELOPE_CACHE_DIR"):
+        envelope_cache = EnvelopeCache(Path(config["ENVELOPE_CACHE_DIR"]),
+                                       max_size_mb=config.get("ENVELOPE_CACHE_MAX_MB", 512))
     
     # Initialize processor
     processor = NoiseGateProcessor(
         threshold_db=config["NOISE_GATE_THRESHOLD_DB"],
         attack_ms=config["NOISE_GATE_ATTACK_MS"],
         release_ms=config["NOISE_GATE_RELEASE_MS"],
-        ratio=config["NOISE_GATE_RATIO"]
+        ratio=config["NOISE_GATE_RATIO"],
+        control_hop=config.get("NOISE_GATE_CONTROL_HOP"),
+        envelope_mode=config.get("GATE_ENVELOPE_MODE", "rms"),
+        stream_block_size=config.get("NOISE_GATE_STREAM_BLOCK_SIZE"),
+        envelope_cache=envelope_cache,
+        auto_threshold=config.get("NOISE_GATE_AUTO_THRESHOLD", False)
     )
     
+    # Threshold sweep (report only, no gated output)
+    if args.threshold_sweep:
+        thresholds_db = parse_sweep_range(args.threshold_sweep)
+        ratios = parse_sweep_range(args.ratio_sweep) if args.ratio_sweep else None
+        sweep_files = [args.input] if args.input else get_audio_files(args.input_dir or Path(config["INPUT_DIRECTORY"]))
+        for audio_file in sweep_files:
+            processor.sweep_file(audio_file, thresholds_db, ratios, args.sweep_excerpt_dir,
+                                 args.sweep_excerpt_start, args.sweep_excerpt_seconds)
+        return
+    
     # Single file processing
     if args.input and args.output:
         success = processor.process_file(args.input, args.output)
@@ -227,7 +689,7 @@ def main():
     logger.info(f"Found {len(audio_files)} audio files to process")
     logger.info(f"Input: {input_dir}")
     logger.info(f"Output: {output_dir}")
-    logger.info(f"Threshold: {config['NOISE_GATE_THRESHOLD_DB']}dB")
+    logger.info(f"Threshold: {'auto' if config.get('NOISE_GATE_AUTO_THRESHOLD') else str(config['NOISE_GATE_THRESHOLD_DB']) + 'dB'}")
     logger.info(f"Attack: {config['NOISE_GATE_ATTACK_MS']}ms")
     logger.info(f"Release: {config['NOISE_GATE_RELEASE_MS']}ms")
     logger.info(f"Ratio: {config['NOISE_GATE_RATIO']}")
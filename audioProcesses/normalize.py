@@ -13,6 +13,7 @@ Usage:
 
 import argparse
 import logging
+import sys
 import time
 from pathlib import Path
 from typing import Tuple, Optional
@@ -21,6 +22,10 @@ import librosa
 import soundfile as sf
 from tqdm import tqdm
 
+# Shared normalization kernels live in src/audio (repo root is two levels up)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.audio.normalization import measure_levels, normalization_scale, scale_clip_blocks, normalize_file
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -48,28 +53,15 @@ class AudioNormalizer:
             raise
     
     def normalize_audio(self, audio: np.ndarray) -> np.ndarray:
-        """Normalize audio volume to target level."""
+        """Normalize audio volume to target level (block-wise, no full-size temporaries)."""
         try:
-            # Calculate RMS
-            rms = np.sqrt(np.mean(audio ** 2))
+            # RMS and peak in one block-wise pass
+            stats = measure_levels(audio)
+            scale_factor = normalization_scale(stats.rms, stats.peak, self.target_db, self.max_amplitude)
             
-            if rms > 0:
-                # Convert target dB to amplitude
-                target_amplitude = 10 ** (self.target_db / 20)
-                
-                # Calculate scaling factor
-                scale_factor = target_amplitude / rms
-                
-                # Prevent clipping
-                max_amplitude = np.max(np.abs(audio))
-                if max_amplitude * scale_factor > self.max_amplitude:
-                    scale_factor = self.max_amplitude / max_amplitude
-                
-                # Apply normalization
-                normalized_audio = audio * scale_factor
-                
-                # Clip to prevent overflow
-                normalized_audio = np.clip(normalized_audio, -self.max_amplitude, self.max_amplitude)
+            if scale_factor is not None:
+                # Apply normalization, clipped to prevent overflow, straight into the output array
+                normalized_audio = scale_clip_blocks(audio, scale_factor, self.max_amplitude)
                 
                 logger.debug(f"Normalized audio (scale: {scale_factor:.3f})")
                 return normalized_audio
@@ -91,20 +83,23 @@ class AudioNormalizer:
             raise
     
     def process_file(self, input_file: Path, output_file: Path) -> bool:
-        """Process single file: Load → Normalize → Save."""
+        """Process single file: Load → Normalize → Save (streamed when soundfile can read the format)."""
         start_time = time.time()
         
         try:
             logger.info(f"Normalizing: {input_file.name}")
             
-            # Load audio
-            audio, sample_rate = self.load_audio(input_file)
-            
-            # Normalize
-            normalized_audio = self.normalize_audio(audio)
-            
-            # Save
-            self.save_audio(normalized_audio, sample_rate, output_file)
+            try:
+                # Two streaming passes (measure, then scale and write): memory stays at one block
+                scale_factor = normalize_file(input_file, output_file, self.target_db, self.max_amplitude)
+                if scale_factor is not None:
+                    logger.debug(f"Normalized audio (scale: {scale_factor:.3f})")
+            except (sf.LibsndfileError, RuntimeError, TypeError) as e:
+                # Formats soundfile cannot stream (e.g. m4a input or output): load → normalize → save in memory
+                logger.debug(f"Streaming normalization unavailable ({e}), normalizing in memory")
+                audio, sample_rate = self.load_audio(input_file)
+                normalized_audio = self.normalize_audio(audio)
+                self.save_audio(normalized_audio, sample_rate, output_file)
             
             processing_time = time.time() - start_time
             logger.info(f"Completed: {output_file.name} ({processing_time:.2f}s)")
@@ -47,7 +47,11 @@ class SimpleAudioProcessor:
         # Initialize processing components with config settings
         self.torchgate_processor = TorchGateProcessor(
             torchgate_settings=CONFIG.get("TORCHGATE_SETTINGS", {}),
-            device=device
+            device=device,
+            chunk_size_mb=CONFIG.get("CHUNK_SIZE_MB", 1),
+            max_memory_gb=CONFIG.get("MAX_MEMORY_USAGE_GB", 4),
+            compile=CONFIG.get("TORCHGATE_COMPILE", False),
+            compile_cache_dir=CONFIG.get("TORCHGATE_COMPILE_CACHE_DIR")
         )
         
         self.normalizer = AudioNormalizer(
@@ -62,7 +66,10 @@ class SimpleAudioProcessor:
                 threshold_db=CONFIG.get("NOISE_GATE_THRESHOLD_DB", -35.0),
                 attack_ms=CONFIG.get("NOISE_GATE_ATTACK_MS", 20.0),
                 release_ms=CONFIG.get("NOISE_GATE_RELEASE_MS", 1200.0),
-                ratio=10.0
+                ratio=10.0,
+                control_hop=CONFIG.get("NOISE_GATE_CONTROL_HOP"),
+                envelope_mode=CONFIG.get("GATE_ENVELOPE_MODE", "rms"),
+                auto_threshold=CONFIG.get("NOISE_GATE_AUTO_THRESHOLD", False)
             )
         
         logger.info(f"Processor initialized with device: {device}")
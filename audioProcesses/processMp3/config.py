@@ -25,6 +25,7 @@ OUTPUT_DIRECTORY = "../../audioFiles/mergedAudio"         # Folder where cleaned
 
 # File naming
 OUTPUT_FILE_PREFIX = "processed_"         # Prefix added to cleaned files (e.g., "processed_audio.mp3")
+SESSION_FILE_PATTERN = r"^(?P<session>.*?)[_ -]*(?:ch|mic|channel|track)[_ -]*\d+$"  # Groups files into sessions by the part before the channel number (e.g. "hearing_mic1" -> "hearing"); non-matching files are processed alone
 
 # =============================================================================
 # 🎵 NOISE REDUCTION SETTINGS
@@ -36,6 +37,10 @@ ENABLE_NOISE_GATE = True              # False = skip noise gate to preserve all
 NOISE_GATE_THRESHOLD_DB = -35.0        # Much lower threshold if gate is re-enabled
 NOISE_GATE_ATTACK_MS = 20              # Very slow attack to prevent choppy audio
 NOISE_GATE_RELEASE_MS = 1200           # Very long release to prevent word cutting
+NOISE_GATE_CONTROL_HOP = 128           # Compute gate gain every N samples (None = per sample, slowest)
+NOISE_GATE_CHANNEL_THRESHOLDS_DB = None # Per-channel thresholds in file order within each session, e.g. [-35.0, -38.0, ...] (None = use NOISE_GATE_THRESHOLD_DB)
+NOISE_GATE_STREAM_BLOCK_SIZE = 65536   # Samples per channel read and gated at a time (memory per session stays at its output)
+NOISE_GATE_AUTO_THRESHOLD = False      # True = estimate thresholds per channel from each file's noise floor (ignores the thresholds above)
 
 # TorchGate specific settings (AI-powered noise reduction)
 # MAXIMUM AGGRESSIVE PROCESSING: Extreme noise removal to eliminate room hiss
@@ -48,6 +53,8 @@ TORCHGATE_SETTINGS = {
     "freq_mask_smooth_hz": 150,        # Less smoothing for maximum processing
     "time_mask_smooth_ms": 20,         # Less smoothing for maximum processing
     "prop_decrease": 0.8,              # Maximum reduction to eliminate room hiss
+    "precision": "float32",            # "bfloat16" = reduced-precision mask on CPUs with native bf16 (checked against float32)
+    "precision_tolerance": 0.02,       # Max spectral deviation from float32 before falling back to it
 }
 
 # =============================================================================
@@ -64,6 +71,14 @@ NORMALIZATION_TARGET_DB = -24.0       # Target loudness in dB
 # GPU/CPU settings
 FORCE_CPU_PROCESSING = False           # True = force CPU only, False = use GPU if available
 
+# Memory settings (long files run TorchGate in crossfaded chunks instead of one huge STFT)
+CHUNK_SIZE_MB = 1                      # Audio per TorchGate chunk (in MB of float32 samples)
+MAX_MEMORY_USAGE_GB = 4                # Files whose single-pass TorchGate would exceed this are chunked
+
+# TorchGate compilation (torch.compile; the compile cost is paid once per run, then reused for every file)
+TORCHGATE_COMPILE = False              # True = compile and warm up TorchGate before the first file
+TORCHGATE_COMPILE_CACHE_DIR = None     # Folder for compiled kernels shared across runs (None = torch default)
+
 # =============================================================================
 # ⚠️  DO NOT MODIFY BELOW THIS LINE
 # =============================================================================
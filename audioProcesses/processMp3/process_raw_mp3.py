@@ -5,6 +5,8 @@ Local AI-powered noise reduction for courtroom audio files.
 All processing happens locally - no data leaves your computer!
 """
 
+import argparse
+import copy
 import logging
 import time
 from pathlib import Path
@@ -19,11 +21,15 @@ from tqdm import tqdm
 import config
 CONFIG = config.get_config()
 
-# Import processing classes directly from individual files
+# Import processing classes directly from individual files (audioProcesses/)
+# and the shared src package (repository root)
 import sys
-sys.path.append('..')
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
 from torchgate import TorchGateProcessor
 from noisegate import NoiseGateProcessor
+from src.utils.parallel import run_parallel
+from src.utils.file_utils import group_sessions
 
 # Setup logging
 logging.basicConfig(
@@ -51,27 +57,53 @@ def save_audio(audio: np.ndarray, sample_rate: int, output_path: Path) -> None:
         logger.error(f"Error saving {output_path}: {e}")
         raise
 
-def process_file(input_file: Path, output_file: Path, processors: dict) -> bool:
-    """Process single file using individual DSP functions."""
+def channel_noise_gate(noise_gate: NoiseGateProcessor, index: int, channels: int) -> NoiseGateProcessor:
+    """Noise gate for one channel of a session (its NOISE_GATE_CHANNEL_THRESHOLDS_DB entry, if any)."""
+    thresholds = noise_gate.channel_thresholds_db
+    if thresholds is None or len(thresholds) != channels:
+        return noise_gate
+    channel_gate = copy.copy(noise_gate)
+    channel_gate.threshold_db = thresholds[index]
+    return channel_gate
+
+def gate_session(audio_files: list, noise_gate: NoiseGateProcessor) -> list:
+    """
+    Load and gate the channels of one session; returns (file, gated audio, sample rate) per loaded file.
+    
+    Equal-length channels are streamed block by block through one batched
+    gate. If that fails (e.g. the channels differ in length or sample rate,
+    or a file cannot be streamed), every file is loaded and gated on its own.
+    """
+    if len(audio_files) > 1:
+        try:
+            logger.info(f"Applying noise gate to {len(audio_files)} channels...")
+            gated, sample_rate = noise_gate.stream_channels(audio_files)
+            return [(audio_file, audio, sample_rate) for audio_file, audio in zip(audio_files, gated)]
+        except Exception as e:
+            logger.warning(f"Batched noise gate unavailable ({e}), gating each file on its own")
+    
+    loaded = []
+    for index, audio_file in enumerate(audio_files):
+        try:
+            audio, sample_rate = load_audio(audio_file)
+            audio = channel_noise_gate(noise_gate, index, len(audio_files)).apply_noise_gate(audio, sample_rate)
+            loaded.append((audio_file, audio, sample_rate))
+        except Exception as e:
+            logger.error(f"Error gating {audio_file.name}: {str(e)}")
+    return loaded
+
+def process_channel(audio: np.ndarray, sample_rate: int, output_file: Path, processors: dict,
+                    denoised: bool = False) -> bool:
+    """Run the per-channel stages on already gated (and possibly denoised) audio and save it."""
     start_time = time.time()
     
     try:
-        logger.info(f"Processing: {input_file.name}")
-        
-        # STEP 1: Load audio
-        audio, sample_rate = load_audio(input_file)
-        
-        # STEP 2: Apply noise gate (if enabled)
-        if processors.get('noise_gate'):
-            logger.info("Applying noise gate...")
-            audio = processors['noise_gate'].apply_noise_gate(audio, sample_rate)
-        
-        # STEP 3: Apply TorchGate AI noise removal
-        if processors.get('torchgate'):
+        # Apply TorchGate AI noise removal (unless the session pass already did)
+        if processors.get('torchgate') and not denoised:
             logger.info("Applying TorchGate AI noise removal...")
             audio = processors['torchgate'].apply_torchgate(audio, sample_rate)
         
-        # STEP 4: Save processed audio
+        # Save processed audio
         save_audio(audio, sample_rate, output_file)
         
         processing_time = time.time() - start_time
@@ -80,42 +112,77 @@ def process_file(input_file: Path, output_file: Path, processors: dict) -> bool:
         return True
         
     except Exception as e:
-        processing_time = time.time() - start_time
-        logger.error(f"Error processing {input_file.name}: {str(e)}")
+        logger.error(f"Error processing {output_file.name}: {str(e)}")
         return False
 
-def get_audio_files(directory: Path) -> list:
-    """Get all audio files from directory."""
-    supported_formats = {'.wav', '.mp3', '.m4a', '.flac', '.aac', '.ogg'}
-    audio_files = []
+def process_session(audio_files: list, output_dir: Path, processors: dict) -> int:
+    """
+    Process all channels of one session.
     
-    for file_path in directory.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() in supported_formats:
-            audio_files.append(file_path)
+    Channels are loaded and noise gated together (streamed through a single
+    batched gate), denoised in a single batched TorchGate pass, then saved
+    per channel. Returns the success count.
+    """
+    for audio_file in audio_files:
+        logger.info(f"Processing: {audio_file.name}")
     
-    return sorted(audio_files)
-
-def main():
-    """Main processing function."""
-    # Use config settings for directories
-    input_dir = Path(CONFIG.get("INPUT_DIRECTORY", "../../audioFiles/sourceAudio"))
-    output_dir = Path(CONFIG.get("OUTPUT_DIRECTORY", "../../audioFiles/workingAudio"))
+    # STEP 1-2: Load every channel, noise gated as one session (if enabled)
+    if processors.get('noise_gate'):
+        loaded = gate_session(audio_files, processors['noise_gate'])
+    else:
+        loaded = []
+        for audio_file in audio_files:
+            try:
+                audio, sample_rate = load_audio(audio_file)
+                loaded.append((audio_file, audio, sample_rate))
+            except Exception:
+                continue
     
-    # Create output directory
-    output_dir.mkdir(exist_ok=True)
+    if not loaded:
+        return 0
     
-    # Get audio files
-    audio_files = get_audio_files(input_dir)
+    # STEP 3: Apply TorchGate to the whole session in one forward pass (same sample rate only)
+    denoised = False
+    if processors.get('torchgate') and len(loaded) > 1 and len({sr for _, _, sr in loaded}) == 1:
+        logger.info(f"Applying TorchGate AI noise removal to {len(loaded)} channels...")
+        cleaned = processors['torchgate'].apply_torchgate_batch([audio for _, audio, _ in loaded], loaded[0][2])
+        loaded = [(audio_file, audio, sample_rate)
+                  for (audio_file, _, sample_rate), audio in zip(loaded, cleaned)]
+        denoised = True
     
-    if not audio_files:
-        logger.warning(f"No audio files found in {input_dir}")
-        return
+    # STEP 4: Per-channel processing and save
+    successful = 0
+    prefix = CONFIG.get("OUTPUT_FILE_PREFIX", "processed_")
+    for audio_file, audio, sample_rate in tqdm(loaded, desc="Processing files"):
+        # Create output filename using config prefix
+        output_file = output_dir / f"{prefix}{audio_file.name}"
+        
+        if process_channel(audio, sample_rate, output_file, processors, denoised):
+            successful += 1
     
-    logger.info(f"Found {len(audio_files)} audio files to process")
-    logger.info(f"Input: {input_dir}")
-    logger.info(f"Output: {output_dir}")
+    return successful
+
+def process_file_task(processors: dict, item: tuple) -> bool:
+    """
+    Worker task: load, gate, denoise and save one channel on its own.
+    item is (input_file, output_file, threshold_db); threshold_db is the
+    channel's entry in NOISE_GATE_CHANNEL_THRESHOLDS_DB, or None.
+    """
+    audio_file, output_file, threshold_db = item
+    logger.info(f"Processing: {audio_file.name}")
+    audio, sample_rate = load_audio(audio_file)
+    
+    if processors.get('noise_gate'):
+        noise_gate = processors['noise_gate']
+        if threshold_db is not None:
+            noise_gate = copy.copy(noise_gate)
+            noise_gate.threshold_db = threshold_db
+        audio = noise_gate.apply_noise_gate(audio, sample_rate)
     
-    # Initialize processors based on config
+    return process_channel(audio, sample_rate, output_file, processors)
+
+def build_processors() -> dict:
+    """Build the TorchGate and (if enabled) noise gate processors from the config."""
     processors = {}
     
     # Device selection
@@ -128,36 +195,109 @@ def main():
     # Initialize TorchGate processor
     processors['torchgate'] = TorchGateProcessor(
         torchgate_settings=CONFIG.get("TORCHGATE_SETTINGS", {}),
-        device=device
+        device=device,
+        chunk_size_mb=CONFIG.get("CHUNK_SIZE_MB", 1),
+        max_memory_gb=CONFIG.get("MAX_MEMORY_USAGE_GB", 4),
+        compile=CONFIG.get("TORCHGATE_COMPILE", False),
+        compile_cache_dir=CONFIG.get("TORCHGATE_COMPILE_CACHE_DIR")
     )
     
-
-    
     # Initialize noise gate if enabled in config
-    noise_gate_enabled = CONFIG.get("ENABLE_NOISE_GATE", False)
-    if noise_gate_enabled:
+    if CONFIG.get("ENABLE_NOISE_GATE", False):
         processors['noise_gate'] = NoiseGateProcessor(
             threshold_db=CONFIG.get("NOISE_GATE_THRESHOLD_DB", -35.0),
             attack_ms=CONFIG.get("NOISE_GATE_ATTACK_MS", 20.0),
             release_ms=CONFIG.get("NOISE_GATE_RELEASE_MS", 1200.0),
-            ratio=10.0
+            ratio=10.0,
+            control_hop=CONFIG.get("NOISE_GATE_CONTROL_HOP"),
+            envelope_mode=CONFIG.get("GATE_ENVELOPE_MODE", "rms"),
+            stream_block_size=CONFIG.get("NOISE_GATE_STREAM_BLOCK_SIZE"),
+            channel_thresholds_db=CONFIG.get("NOISE_GATE_CHANNEL_THRESHOLDS_DB"),
+            auto_threshold=CONFIG.get("NOISE_GATE_AUTO_THRESHOLD", False)
         )
     
     logger.info(f"Processor initialized with device: {device}")
-    logger.info(f"Noise gate enabled: {noise_gate_enabled}")
+    return processors
+
+def process_parallel(audio_files: list, output_dir: Path, jobs: int, threads_per_job: int = None) -> int:
+    """
+    Process channels independently across worker processes (each with its own
+    processors). Returns the success count.
+    """
+    prefix = CONFIG.get("OUTPUT_FILE_PREFIX", "processed_")
+    channel_thresholds = CONFIG.get("NOISE_GATE_CHANNEL_THRESHOLDS_DB")
+    
+    # Each channel gets its session's threshold entry (by position in the session)
+    thresholds = {}
+    for session in group_sessions(audio_files, CONFIG.get("SESSION_FILE_PATTERN")):
+        if channel_thresholds is not None and len(channel_thresholds) != len(session):
+            logger.warning(f"Got {len(channel_thresholds)} channel thresholds for {len(session)} channels, "
+                           f"using NOISE_GATE_THRESHOLD_DB for {session[0].name} and its session")
+        elif channel_thresholds is not None:
+            thresholds.update(zip(session, channel_thresholds))
+    
+    items = [(audio_file, output_dir / f"{prefix}{audio_file.name}", thresholds.get(audio_file))
+             for audio_file in audio_files]
+    results = run_parallel(process_file_task, items, build_processors, (), jobs, threads_per_job,
+                           desc="Processing files")
     
-    # Process all files
     successful = 0
+    for audio_file, (completed, result) in zip(audio_files, results):
+        if completed and result:
+            successful += 1
+        elif not completed:
+            logger.error(f"Worker failed on {audio_file.name}: {result}")
+    return successful
+
+def get_audio_files(directory: Path) -> list:
+    """Get all audio files from directory."""
+    supported_formats = {'.wav', '.mp3', '.m4a', '.flac', '.aac', '.ogg'}
+    audio_files = []
+    
+    for file_path in directory.iterdir():
+        if file_path.is_file() and file_path.suffix.lower() in supported_formats:
+            audio_files.append(file_path)
+    
+    return sorted(audio_files)
+
+def main():
+    """Main processing function."""
+    parser = argparse.ArgumentParser(description="Courtroom Audio Processor")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes (> 1 processes channels independently instead of by session)")
+    parser.add_argument("--threads-per-job", type=int, help="Torch threads per worker (default: cores / jobs)")
+    args = parser.parse_args()
+    
+    # Use config settings for directories
+    input_dir = Path(CONFIG.get("INPUT_DIRECTORY", "../../audioFiles/sourceAudio"))
+    output_dir = Path(CONFIG.get("OUTPUT_DIRECTORY", "../../audioFiles/workingAudio"))
+    
+    # Create output directory
+    output_dir.mkdir(exist_ok=True)
+    
+    # Get audio files
+    audio_files = get_audio_files(input_dir)
+    
+    if not audio_files:
+        logger.warning(f"No audio files found in {input_dir}")
+        return
+    
+    logger.info(f"Found {len(audio_files)} audio files to process")
+    logger.info(f"Input: {input_dir}")
+    logger.info(f"Output: {output_dir}")
+    
+    logger.info(f"Noise gate enabled: {CONFIG.get('ENABLE_NOISE_GATE', False)}")
     total = len(audio_files)
     
-    for audio_file in tqdm(audio_files, desc="Processing files"):
-        # Create output filename using config prefix
-        prefix = CONFIG.get("OUTPUT_FILE_PREFIX", "processed_")
-        output_filename = f"{prefix}{audio_file.name}"
-        output_file = output_dir / output_filename
-        
-        if process_file(audio_file, output_file, processors):
-            successful += 1
+    if args.jobs > 1:
+        # Channels spread over worker processes
+        successful = process_parallel(audio_files, output_dir, args.jobs, args.threads_per_job)
+    else:
+        # Process each session's files together (one file per microphone channel)
+        sessions = group_sessions(audio_files, CONFIG.get("SESSION_FILE_PATTERN"))
+        logger.info(f"Grouped into {len(sessions)} sessions")
+        processors = build_processors()
+        successful = sum(process_session(session, output_dir, processors) for session in sessions)
     
     # Summary
     logger.info(f"Processing complete: {successful}/{total} files successful")
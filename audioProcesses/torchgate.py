@@ -13,14 +13,21 @@ Usage:
 
 import argparse
 import logging
+import sys
 import time
 from pathlib import Path
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, Sequence
 import numpy as np
 import librosa
 import soundfile as sf
 import torch
-from tqdm import tqdm
+
+# Shared modules live in src/audio (repo root is two levels up)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.audio.torchgate_cache import get_torchgate, torchgate_cache_info
+from src.audio.chunked_torchgate import run_torchgate
+from src.audio.tensor_io import audio_to_tensor, tensor_to_audio
+from src.utils.parallel import run_parallel
 
 # Setup logging
 logging.basicConfig(
@@ -32,11 +39,20 @@ logger = logging.getLogger(__name__)
 class TorchGateProcessor:
     """Standalone TorchGate noise reduction processor."""
     
-    def __init__(self, torchgate_settings: Dict[str, Any], device: str = "cpu"):
-        """Initialize TorchGate processor with settings."""
+    def __init__(self, torchgate_settings: Dict[str, Any], device: str = "cpu",
+                 chunk_size_mb: float = 1, max_memory_gb: float = 4,
+                 compile: bool = False, compile_cache_dir: Optional[str] = None):
+        """
+        Initialize TorchGate processor with settings (long files run in chunked overlap-add mode).
+        With compile=True the module is compiled and warmed up once per process.
+        """
         self.torchgate_settings = torchgate_settings
         self.device = torch.device(device)
-        logger.info(f"TorchGate initialized: device={device}")
+        self.chunk_size = int(chunk_size_mb * 1024 * 1024)
+        self.max_memory_gb = max_memory_gb
+        self.compile = compile
+        self.compile_cache_dir = compile_cache_dir
+        logger.info(f"TorchGate initialized: device={device}, compiled={compile}")
         logger.info(f"Settings: {torchgate_settings}")
     
     def load_audio(self, file_path: Path) -> Tuple[np.ndarray, int]:
@@ -52,36 +68,24 @@ class TorchGateProcessor:
     def apply_torchgate(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
         """Apply TorchGate AI noise removal."""
         try:
-            from noisereduce.torchgate import TorchGate
-            
-            # Convert to torch tensor
-            audio_tensor = torch.tensor(audio.copy(), dtype=torch.float32, device=self.device)
+            # Convert to torch tensor (zero-copy for contiguous float32 audio on CPU)
+            audio_tensor = audio_to_tensor(audio, self.device)
             
             # Add batch dimension if needed
             if audio_tensor.dim() == 1:
                 audio_tensor = audio_tensor.unsqueeze(0)
             
             logger.debug("Applying TorchGate AI noise removal")
-            tg = TorchGate(
-                sr=sample_rate,
-                nonstationary=self.torchgate_settings.get("nonstationary", False),
-                n_std_thresh_stationary=self.torchgate_settings.get("n_std_thresh_stationary", 1.5),
-                n_thresh_nonstationary=self.torchgate_settings.get("n_thresh_nonstationary", 1.3),
-                temp_coeff_nonstationary=self.torchgate_settings.get("temp_coeff_nonstationary", 0.1),
-                n_movemean_nonstationary=self.torchgate_settings.get("n_movemean_nonstationary", 20),
-                freq_mask_smooth_hz=self.torchgate_settings.get("freq_mask_smooth_hz", 500),
-                time_mask_smooth_ms=self.torchgate_settings.get("time_mask_smooth_ms", 50),
-                prop_decrease=self.torchgate_settings.get("prop_decrease", 0.1)
-            ).to(self.device)
-            
-            # Apply noise reduction
-            enhanced_audio = tg(audio_tensor)
+            tg = self._torchgate(sample_rate)
+            
+            # Apply noise reduction (chunked when one pass would exceed max_memory_gb)
+            enhanced_audio = run_torchgate(tg, audio_tensor, self.chunk_size, self.max_memory_gb, **self._precision())
             
             # Convert back to numpy
             if enhanced_audio.dim() > 1:
                 enhanced_audio = enhanced_audio.squeeze(0)
             
-            cleaned_audio = enhanced_audio.cpu().numpy()
+            cleaned_audio = tensor_to_audio(enhanced_audio)
             
             # Validate output
             if not np.isfinite(cleaned_audio).all():
@@ -96,6 +100,70 @@ class TorchGateProcessor:
             logger.info("Using original audio")
             return audio
     
+    def apply_torchgate_batch(self, channels: Sequence[np.ndarray], sample_rate: int) -> list:
+        """
+        Apply TorchGate to several channels in one (channels, samples) forward pass.
+        
+        Channels are zero padded to a common length and trimmed back to the
+        length a single-channel pass returns. Padding counts towards a
+        channel's stationary noise statistics, so this suits channels of
+        (nearly) equal length such as the mics of one session.
+        """
+        try:
+            lengths = [len(audio) for audio in channels]
+            
+            # Pad channels to a common length (zeros match the STFT's edge padding)
+            session = np.zeros((len(channels), max(lengths)), dtype=np.float32)
+            for row, audio in zip(session, channels):
+                row[:len(audio)] = audio
+            
+            logger.debug(f"Applying TorchGate AI noise removal to {len(channels)} channels")
+            tg = self._torchgate(sample_rate)
+            session_tensor = audio_to_tensor(session, self.device)
+            enhanced = tensor_to_audio(run_torchgate(tg, session_tensor, self.chunk_size, self.max_memory_gb,
+                                                      **self._precision()))
+            
+            cleaned_channels = []
+            for index, (audio, cleaned, length) in enumerate(zip(channels, enhanced, lengths)):
+                cleaned = cleaned[:length // tg.hop_length * tg.hop_length]
+                
+                # Validate output
+                if not np.isfinite(cleaned).all():
+                    logger.warning(f"TorchGate produced invalid values for channel {index}, using original audio")
+                    cleaned = audio
+                cleaned_channels.append(cleaned)
+            
+            logger.debug("Batched TorchGate completed")
+            return cleaned_channels
+            
+        except Exception as e:
+            logger.error(f"Error in batched TorchGate: {e}")
+            logger.info("Processing channels one at a time")
+            return [self.apply_torchgate(audio, sample_rate) for audio in channels]
+    
+    def _torchgate(self, sample_rate: int) -> torch.nn.Module:
+        """Configured TorchGate module for a sample rate (shared through the module cache)."""
+        return get_torchgate(
+            sample_rate, self.device,
+            compiled=self.compile,
+            compile_cache_dir=self.compile_cache_dir,
+            nonstationary=self.torchgate_settings.get("nonstationary", False),
+            n_std_thresh_stationary=self.torchgate_settings.get("n_std_thresh_stationary", 1.5),
+            n_thresh_nonstationary=self.torchgate_settings.get("n_thresh_nonstationary", 1.3),
+            temp_coeff_nonstationary=self.torchgate_settings.get("temp_coeff_nonstationary", 0.1),
+            n_movemean_nonstationary=self.torchgate_settings.get("n_movemean_nonstationary", 20),
+            freq_mask_smooth_hz=self.torchgate_settings.get("freq_mask_smooth_hz", 500),
+            time_mask_smooth_ms=self.torchgate_settings.get("time_mask_smooth_ms", 50),
+            prop_decrease=self.torchgate_settings.get("prop_decrease", 0.1)
+        )
+    
+    def _precision(self) -> Dict[str, Any]:
+        """Mask precision settings for run_torchgate (reduced precision is checked against float32)."""
+        return {
+            "precision": self.torchgate_settings.get("precision", "float32"),
+            "precision_tolerance": self.torchgate_settings.get("precision_tolerance", 0.02),
+        }
+    
     def save_audio(self, audio: np.ndarray, sample_rate: int, output_path: Path) -> None:
         """Save audio to file."""
         try:
@@ -131,6 +199,14 @@ class TorchGateProcessor:
             logger.error(f"Error processing {input_file.name}: {str(e)}")
             return False
 
+def build_processor(processor_kwargs: Dict[str, Any]) -> TorchGateProcessor:
+    """Worker initializer: one TorchGateProcessor per worker process."""
+    return TorchGateProcessor(**processor_kwargs)
+
+def process_file_task(processor: TorchGateProcessor, item: Tuple[Path, Path]) -> bool:
+    """Worker task: process one (input_file, output_file) pair."""
+    return processor.process_file(*item)
+
 def get_audio_files(directory: Path) -> list:
     """Get all audio files from directory."""
     supported_formats = {'.wav', '.mp3', '.m4a', '.flac', '.aac', '.ogg'}
@@ -161,9 +237,15 @@ def load_config(config_path: Optional[Path] = None) -> dict:
                 "n_movemean_nonstationary": 20,
                 "freq_mask_smooth_hz": 500,
                 "time_mask_smooth_ms": 50,
-                "prop_decrease": 0.1
+                "prop_decrease": 0.1,
+                "precision": "float32",
+                "precision_tolerance": 0.02
             },
             "FORCE_CPU_PROCESSING": False,
+            "CHUNK_SIZE_MB": 1,
+            "MAX_MEMORY_USAGE_GB": 4,
+            "TORCHGATE_COMPILE": False,
+            "TORCHGATE_COMPILE_CACHE_DIR": None,
             "INPUT_DIRECTORY": "input",
             "OUTPUT_DIRECTORY": "output",
             "OUTPUT_FILE_PREFIX": "torchgate_"
@@ -180,6 +262,10 @@ def main():
     parser.add_argument("--prop-decrease", type=float, help="Proportion of noise to decrease")
     parser.add_argument("--nonstationary", action="store_true", help="Enable nonstationary processing")
     parser.add_argument("--device", type=str, default="cpu", help="Device to use (cpu/cuda)")
+    parser.add_argument("--precision", choices=["float32", "bfloat16"], help="TorchGate mask precision")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for batch processing")
+    parser.add_argument("--threads-per-job", type=int, help="Torch threads per worker (default: cores / jobs)")
+    parser.add_argument("--compile", action="store_true", help="Compile TorchGate with torch.compile (one-off warm-up)")
     
     args = parser.parse_args()
     
@@ -191,20 +277,28 @@ def main():
         config["TORCHGATE_SETTINGS"]["prop_decrease"] = args.prop_decrease
     if args.nonstationary:
         config["TORCHGATE_SETTINGS"]["nonstationary"] = True
+    if args.precision:
+        config["TORCHGATE_SETTINGS"]["precision"] = args.precision
     if args.device:
         config["FORCE_CPU_PROCESSING"] = (args.device == "cpu")
+    if args.compile:
+        config["TORCHGATE_COMPILE"] = True
     
     # Determine device
     device = "cpu" if config.get("FORCE_CPU_PROCESSING", False) else args.device
     
-    # Initialize processor
-    processor = TorchGateProcessor(
+    processor_kwargs = dict(
         torchgate_settings=config["TORCHGATE_SETTINGS"],
-        device=device
+        device=device,
+        chunk_size_mb=config.get("CHUNK_SIZE_MB", 1),
+        max_memory_gb=config.get("MAX_MEMORY_USAGE_GB", 4),
+        compile=config.get("TORCHGATE_COMPILE", False),
+        compile_cache_dir=config.get("TORCHGATE_COMPILE_CACHE_DIR")
     )
     
     # Single file processing
     if args.input and args.output:
+        processor = TorchGateProcessor(**processor_kwargs)
         success = processor.process_file(args.input, args.output)
         exit(0 if success else 1)
     
@@ -227,20 +321,26 @@ def main():
     logger.info(f"Output: {output_dir}")
     logger.info(f"Device: {device}")
     
-    # Process all files
+    # Process all files (across --jobs worker processes; results come back in input order)
+    prefix = config.get('OUTPUT_FILE_PREFIX', 'torchgate_')
+    items = [(audio_file, output_dir / f"{prefix}{audio_file.name}") for audio_file in audio_files]
+    results = run_parallel(process_file_task, items, build_processor, (processor_kwargs,),
+                           args.jobs, args.threads_per_job, desc="Processing with TorchGate")
+    
     successful = 0
     total = len(audio_files)
-    
-    for audio_file in tqdm(audio_files, desc="Processing with TorchGate"):
-        # Create output filename
-        output_filename = f"{config.get('OUTPUT_FILE_PREFIX', 'torchgate_')}{audio_file.name}"
-        output_file = output_dir / output_filename
-        
-        if processor.process_file(audio_file, output_file):
+    for audio_file, (completed, result) in zip(audio_files, results):
+        if completed and result:
             successful += 1
+        elif not completed:
+            logger.error(f"Worker failed on {audio_file.name}: {result}")
     
     # Summary
     logger.info(f"TorchGate processing complete: {successful}/{total} files successful")
+    if args.jobs <= 1:
+        cache_info = torchgate_cache_info()
+        logger.info(f"TorchGate module cache: {cache_info['hits']} hits, {cache_info['misses']} builds "
+                    f"({cache_info['hit_rate']:.0%} hit rate)")
     if successful < total:
         logger.warning(f"{total - successful} files failed to process")
 
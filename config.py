@@ -44,7 +44,7 @@ MULTI_CHANNEL_MODE = True              # True = optimize for multi-channel audio
 
 # Mic bleed reduction settings
 ENABLE_MIC_BLEED_REDUCTION = True      # True = apply additional processing for mic bleed
-MIC_BLEED_FREQUENCY_FILTER = True      # True = apply frequency filtering to reduce bleed
+MIC_BLEED_FREQUENCY_FILTER = True      # True = band-limit channels in the cross-channel gate to reduce bleed
 MIC_BLEED_LOW_FREQ_CUTOFF = 80         # Hz - cut frequencies below this (reduces rumble bleed)
 MIC_BLEED_HIGH_FREQ_CUTOFF = 8000      # Hz - cut frequencies above this (reduces hiss bleed)
 
@@ -52,6 +52,14 @@ MIC_BLEED_HIGH_FREQ_CUTOFF = 8000      # Hz - cut frequencies above this (reduce
 PROCESS_CHANNELS_INDEPENDENTLY = True   # True = each channel processed separately, False = batch processing
 ENABLE_CROSS_CHANNEL_NOISE_REFERENCE = False  # True = use other channels as noise reference (experimental)
 
+# Cross-channel sidechain gate (runs when both ENABLE_MIC_BLEED_REDUCTION and
+# ENABLE_CROSS_CHANNEL_NOISE_REFERENCE are True; files are gated against the others in their session)
+SESSION_FILE_PATTERN = r"^(?P<session>.*?)[_ -]*(?:ch|mic|channel|track)[_ -]*\d+$"  # Groups files into sessions by the part before the channel number (e.g. "hearing_mic1" -> "hearing"); non-matching files are processed alone
+MIC_BLEED_DOMINANCE_DB = 0.0           # dB a channel must be above the loudest other channel to open (negative = allow overlap)
+MIC_BLEED_FLOOR_DB = -20.0             # dB - level of a channel while another channel dominates
+MIC_BLEED_ATTACK_MS = 10               # How quickly a channel opens when it becomes dominant
+MIC_BLEED_RELEASE_MS = 400             # How slowly a channel closes when another takes over
+
 # =============================================================================
 # 🎵 NOISE REDUCTION SETTINGS
 # =============================================================================
@@ -63,24 +71,36 @@ ENABLE_NOISE_GATE = False              # False = skip noise gate to preserve all
 NOISE_GATE_THRESHOLD_DB = -35.0        # Much lower threshold if gate is re-enabled (was -25.0)
 NOISE_GATE_ATTACK_MS = 20              # Very slow attack to prevent choppy audio (was 15)
 NOISE_GATE_RELEASE_MS = 1200           # Very long release to prevent word cutting (was 800)
+GATE_ENVELOPE_MODE = "rms"             # Gate level detector: "rms" (sliding), "exp_rms" (exponential), "peak" (peak hold)
+
+# Automatic gate thresholds (estimated per channel from the envelope instead of hand-tuned per room)
+AUTO_GATE_THRESHOLD = False            # True = ignore NOISE_GATE_THRESHOLD_DB / PRE_GATE_THRESHOLD_DB and estimate them
+AUTO_GATE_NOISE_PERCENTILE = 10.0      # Envelope percentile taken as the room noise floor
+AUTO_GATE_SPEECH_PERCENTILE = 95.0     # Envelope percentile taken as the speech level
+AUTO_GATE_THRESHOLD_POSITION = 0.3     # Threshold position between noise floor (0.0) and speech (1.0)
 
 # Pre-normalization noise gate (removes speech peaks from other mics before normalization)
 ENABLE_PRE_NORMALIZATION_GATE = False  # False = skip for speed (was True)
 
 # Frequency-domain filtering for mic isolation
-ENABLE_FREQUENCY_FILTERING = False     # False = skip for speed (was True)
+ENABLE_FREQUENCY_FILTERING = True      # True = cut rumble/hiss and boost speech (block-streamed, cheap)
 FREQ_LOW_CUTOFF = 100                  # Hz - remove rumble and HVAC noise
 FREQ_HIGH_CUTOFF = 7000                # Hz - remove hiss and high-frequency bleed
 FREQ_SPEECH_BOOST_LOW = 500            # Hz - boost lower speech frequencies
 FREQ_SPEECH_BOOST_HIGH = 3000          # Hz - boost upper speech frequencies
 FREQ_SPEECH_BOOST_AMOUNT = 2.0         # dB - amount to boost speech frequencies
+FREQ_FILTER_BLOCK_SECONDS = 30.0       # Audio filtered per block in both modes (None = whole file at once, more memory)
+FREQ_FILTER_MODE = "stft"              # "stft" = exact per-bin gain, "iir" = much faster filter bank (Butterworth cutoffs + peaking boost)
+SHARED_STFT_STAGES = True              # True = apply the "stft" filter and TorchGate on one shared STFT; the filter then runs at TorchGate's 1024-point resolution instead of 2048 (softer cutoff edges). Not used with TORCHGATE_COMPILE
 
 # Primary noise reduction strength (0.0 = no reduction, 1.0 = maximum reduction)
 # MAXIMUM AGGRESSIVE PROCESSING: Extreme noise removal to eliminate room hiss
 NOISE_REDUCTION_STRENGTH = 0.85        # Maximum aggressive reduction to eliminate room hiss (was 0.7)
 
 # Noise reduction method priority (the script will try these in order)
-# Options: "torchgate" (AI-powered, faster), "spectral" (traditional, more stable)
+# Options: "torchgate" (AI-powered, faster), "spectral" (traditional, more stable),
+#          "fast_nonstationary" (in-project nonstationary gate: same result as TorchGate with
+#          "nonstationary": True, several times faster; ignores the stationary settings)
 PRIMARY_NOISE_REDUCTION_METHOD = "torchgate"
 FALLBACK_NOISE_REDUCTION_METHOD = "spectral"
 
@@ -96,6 +116,8 @@ TORCHGATE_SETTINGS = {
     "freq_mask_smooth_hz": 150,        # Less smoothing for maximum processing (was 200)
     "time_mask_smooth_ms": 20,         # Less smoothing for maximum processing (was 30)
     "prop_decrease": 0.8,              # Maximum reduction to eliminate room hiss (was 0.6)
+    "precision": "float32",            # "bfloat16" = reduced-precision mask on CPUs with native bf16 (checked against float32)
+    "precision_tolerance": 0.02,       # Max spectral deviation from float32 before falling back to it
 }
 
 # Spectral gating settings (traditional noise reduction)
@@ -105,8 +127,19 @@ SPECTRAL_SETTINGS = {
     "n_fft": 2048,                     # FFT window size (higher = better quality)
     "win_length": 2048,                # Window length for analysis
     "hop_length": 512,                 # Step size between windows
+    "chunk_seconds": 30.0,             # Long files are gated in chunks of this length (rounded up to whole hops)...
+    "padding": 30000,                  # ...each with this many samples of context on both sides (30000 = noisereduce's, matches it exactly)
+    "crossfade_ms": 50,                # Overlap where neighbouring chunks are crossfaded
+    "jobs": None,                      # Threads gating chunks in parallel (None = one per core)
 }
 
+# Noise profiles (stationary noise reference from quiet regions of the gated audio, one per mic)
+ENABLE_NOISE_PROFILES = False          # True = reuse a saved mic noise profile instead of re-estimating per file
+NOISE_PROFILE_DIR = "noise_profiles"   # Folder where profiles are saved (keyed by mic - the channel part of the file name, see SESSION_FILE_PATTERN - sample rate, STFT size and gate/normalization settings)
+NOISE_PROFILE_COURTROOM = "courtroom"  # Courtroom name used in profile keys (e.g. "courtroom_3")
+NOISE_PROFILE_PERCENTILE = 20.0        # Quietest % of a recording used as the noise reference
+NOISE_PROFILE_SECONDS = 10.0           # Maximum length of a saved profile
+
 # =============================================================================
 # 🗣️ SPEECH DETECTION SETTINGS
 # =============================================================================
@@ -139,11 +172,22 @@ OUTPUT_BIT_DEPTH = 24                  # 16 or 24 bit audio quality
 # =============================================================================
 
 # Processing chunk size (for large files)
-CHUNK_SIZE_MB = 1                      # Process files in chunks of this size (in MB)
+CHUNK_SIZE_MB = 1                      # Process files in chunks of this size (in MB); used by chunked TorchGate
 
 # GPU/CPU settings
 FORCE_CPU_PROCESSING = False           # True = force CPU only, False = use GPU if available
-MAX_MEMORY_USAGE_GB = 4                # Maximum memory usage (in GB)
+MAX_MEMORY_USAGE_GB = 4                # Maximum memory usage (in GB); longer files run TorchGate in crossfaded chunks
+
+# TorchGate compilation (torch.compile; pays a one-off compile per worker, then reuses it)
+TORCHGATE_COMPILE = False              # True = compile and warm up TorchGate once per process, False = run it eagerly
+TORCHGATE_COMPILE_CACHE_DIR = None     # Folder for compiled kernels shared across runs (None = torch default)
+
+# Parallel batch processing (files are split across worker processes)
+PARALLEL_JOBS = 1                      # Worker processes for batch runs (1 = process files one after another)
+THREADS_PER_JOB = None                 # Torch threads per worker (None = split the CPU cores evenly between workers)
+
+# Processing chain backend
+PROCESSING_BACKEND = "numpy"           # "numpy" = per-stage numpy arrays, "torch" = one tensor from load to save (on the GPU when available)
 
 # =============================================================================
 # 📊 LOGGING AND MONITORING
@@ -168,6 +212,8 @@ SKIP_EXISTING_FILES = False            # True = skip files that already exist in
 # Audio validation
 VALIDATE_AUDIO_OUTPUT = True           # True = check for invalid audio values, False = skip validation
 MAX_AUDIO_AMPLITUDE = 1.0              # Maximum allowed audio amplitude (prevent clipping)
+REPAIR_PADDING_SECONDS = 1.0           # Context around an invalid region when rerunning it through the fallback
+REPAIR_CROSSFADE_MS = 20               # Crossfade when splicing a repaired region back in
 
 # =============================================================================
 # 🎯 PRESET CONFIGURATIONS
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+⏱️ Nonstationary Gate Benchmark
+===============================
+
+Times the in-project NonstationarySpectralGate against noisereduce's
+TorchGate(nonstationary=True) on the same synthetic inputs and reports how
+far their outputs differ.
+
+Usage:
+    python scripts/benchmark_spectral_gate.py
+    python scripts/benchmark_spectral_gate.py --durations 60,600,3600 --sample-rate 44100 --repeats 2
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+# Shared modules live in src/ (repo root is one level up)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.config.settings import TORCHGATE_SETTINGS
+from src.audio.chunked_torchgate import spectral_deviation
+from src.audio.spectral_gate import NonstationarySpectralGate
+from src.audio.tensor_io import audio_to_tensor
+from benchmark_torchgate import synthetic_audio
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def time_run(gate: torch.nn.Module, x: torch.Tensor, repeats: int) -> tuple:
+    """Best wall time over repeats, and the last output."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with torch.inference_mode():
+            y = gate(x)
+        best = min(best, time.perf_counter() - start)
+    return best, y
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description="Benchmark the fast nonstationary gate against TorchGate")
+    parser.add_argument("--durations", type=str, default="60,600,3600", help="Comma-separated input lengths (seconds)")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="Sample rate of the synthetic input")
+    parser.add_argument("--repeats", type=int, default=1, help="Timed runs per engine (best is reported)")
+    args = parser.parse_args()
+
+    from noisereduce.torchgate import TorchGate
+
+    settings = {k: v for k, v in TORCHGATE_SETTINGS.items()
+                if k not in ("nonstationary", "precision", "precision_tolerance", "use_gpu")}
+    reference = TorchGate(sr=args.sample_rate, nonstationary=True, **settings)
+    fast = NonstationarySpectralGate(args.sample_rate, **settings)
+
+    rows = []
+    for seconds in [float(d) for d in args.durations.split(",")]:
+        x = audio_to_tensor(synthetic_audio(seconds, args.sample_rate), "cpu").unsqueeze(0)
+        logger.info(f"Running {seconds / 60:.0f} min input ({x.shape[-1]} samples)")
+        fast_time, y_fast = time_run(fast, x, args.repeats)
+        try:
+            reference_time, y_reference = time_run(reference, x, args.repeats)
+        except RuntimeError as e:
+            logger.warning(f"TorchGate failed on {seconds / 60:.0f} min input: {e}")
+            rows.append((seconds, None, fast_time, None, None))
+            continue
+        max_diff = float((y_reference - y_fast).abs().max())
+        deviation = spectral_deviation(y_reference[0], y_fast[0], fast.n_fft, fast.hop_length)
+        rows.append((seconds, reference_time, fast_time, max_diff, deviation))
+
+    print()
+    print(f"{'input':>10} {'TorchGate (s)':>14} {'fast (s)':>9} {'speedup':>8} {'max diff':>10} {'spectral dev':>13}")
+    for seconds, reference_time, fast_time, max_diff, deviation in rows:
+        if reference_time is None:
+            print(f"{seconds / 60:>7.0f} min {'failed':>14} {fast_time:>9.2f} {'-':>8} {'-':>10} {'-':>13}")
+            continue
+        print(f"{seconds / 60:>7.0f} min {reference_time:>14.2f} {fast_time:>9.2f} "
+              f"{reference_time / fast_time:>7.2f}x {max_diff:>10.2e} {deviation:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+⏱️ TorchGate Benchmark
+======================
+
+Times eager vs torch.compile'd TorchGate on synthetic courtroom-like audio
+(speech-band tone bursts over room noise) of the given lengths.
+
+Usage:
+    python scripts/benchmark_torchgate.py
+    python scripts/benchmark_torchgate.py --durations 600,3600 --sample-rate 44100 --repeats 2
+
+Files longer than MAX_MEMORY_USAGE_GB allows run through the chunked
+TorchGate, exactly as in the processing scripts.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Shared modules live in src/ (repo root is one level up)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.config.settings import TORCHGATE_SETTINGS, CHUNK_SIZE, MAX_MEMORY_USAGE_GB
+from src.audio.chunked_torchgate import run_torchgate
+from src.audio.compiled_torchgate import compile_torchgate
+from src.audio.tensor_io import audio_to_tensor
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def synthetic_audio(seconds: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """Room noise with 2 s speech-band tone bursts every 5 s."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    audio = (0.01 * rng.standard_normal(n)).astype(np.float32)
+    t = np.arange(n, dtype=np.float32) / sample_rate
+    bursts = (t % 5.0) < 2.0
+    audio[bursts] += 0.2 * np.sin(2 * np.pi * 300 * t[bursts]) * np.sin(2 * np.pi * 3 * t[bursts])
+    return audio
+
+
+def time_run(tg: torch.nn.Module, x: torch.Tensor, repeats: int, precision: str = "float32") -> tuple:
+    """Best wall time over repeats, and the last output."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        y = run_torchgate(tg, x, CHUNK_SIZE, MAX_MEMORY_USAGE_GB, precision=precision)
+        best = min(best, time.perf_counter() - start)
+    return best, y
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description="Benchmark eager vs compiled TorchGate")
+    parser.add_argument("--durations", type=str, default="600,3600", help="Comma-separated input lengths (seconds)")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="Sample rate of the synthetic input")
+    parser.add_argument("--repeats", type=int, default=1, help="Timed runs per mode (best is reported)")
+    parser.add_argument("--precision", choices=["float32", "bfloat16"], default="float32",
+                        help="Mask precision of the compiled runs")
+    parser.add_argument("--device", type=str, default="cpu", help="Device to use (cpu/cuda)")
+    args = parser.parse_args()
+
+    from noisereduce.torchgate import TorchGate
+
+    device = torch.device(args.device)
+    settings = {k: v for k, v in TORCHGATE_SETTINGS.items() if not k.startswith("precision")}
+    eager = TorchGate(sr=args.sample_rate, **settings).to(device)
+
+    start = time.perf_counter()
+    compiled = compile_torchgate(TorchGate(sr=args.sample_rate, **settings).to(device), args.sample_rate)
+    compile_time = time.perf_counter() - start
+    if not hasattr(compiled, "_orig_mod"):
+        logger.error("torch.compile is not usable here, nothing to compare")
+        return
+
+    logger.info(f"Compile + warm-up: {compile_time:.1f}s (paid once per worker)")
+    rows = []
+    for seconds in [float(d) for d in args.durations.split(",")]:
+        x = audio_to_tensor(synthetic_audio(seconds, args.sample_rate), device).unsqueeze(0)
+        logger.info(f"Running {seconds / 60:.0f} min input ({x.shape[-1]} samples)")
+        eager_time, y_eager = time_run(eager, x, args.repeats)
+        compiled_time, y_compiled = time_run(compiled, x, args.repeats, args.precision)
+        diff = float((y_eager - y_compiled).abs().max())
+        rows.append((seconds, eager_time, compiled_time, diff))
+
+    print()
+    print(f"{'input':>10} {'eager (s)':>10} {'compiled (s)':>13} {'speedup':>8} {'max diff':>10}")
+    for seconds, eager_time, compiled_time, diff in rows:
+        print(f"{seconds / 60:>7.0f} min {eager_time:>10.2f} {compiled_time:>13.2f} "
+              f"{eager_time / compiled_time:>7.2f}x {diff:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Automatic gate threshold estimation.
+Places the threshold between the noise floor and the speech level read from
+a dB histogram of the gate envelope.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Histogram range and resolution (dB)
+HISTOGRAM_FLOOR_DB = -120.0
+HISTOGRAM_BIN_DB = 0.5
+HISTOGRAM_BINS = int(-HISTOGRAM_FLOOR_DB / HISTOGRAM_BIN_DB)
+
+# Envelope values at or below this are digital silence and are not counted
+SILENCE_LEVEL = 1e-7
+
+# Samples converted to dB per step
+HISTOGRAM_BLOCK_SIZE = 1 << 20
+
+# Default estimator settings
+NOISE_PERCENTILE = 10.0
+SPEECH_PERCENTILE = 95.0
+THRESHOLD_POSITION = 0.3
+
+
+class EnvelopeHistogram:
+    """dB histogram of an envelope, accumulated block by block."""
+
+    def __init__(self):
+        """Initialize an empty histogram (channel layout is set by the first update)."""
+        self.counts = None
+
+    def update(self, envelope: np.ndarray) -> "EnvelopeHistogram":
+        """
+        Add envelope values to the histogram.
+
+        Digital silence (at or below SILENCE_LEVEL) is skipped so padding and
+        muted stretches do not drag the noise floor down.
+
+        Args:
+            envelope: Envelope values, samples along the last axis (one
+                      histogram per leading index, e.g. per channel)
+
+        Returns:
+            The histogram itself (for chaining)
+        """
+        envelope = np.asarray(envelope)
+        channels = int(np.prod(envelope.shape[:-1], dtype=np.int64))
+        if self.counts is None:
+            self.counts = np.zeros(envelope.shape[:-1] + (HISTOGRAM_BINS,), dtype=np.int64)
+        rows = envelope.reshape(channels, envelope.shape[-1])
+        counts = self.counts.reshape(channels, HISTOGRAM_BINS)
+
+        for start in range(0, rows.shape[-1], HISTOGRAM_BLOCK_SIZE):
+            block = rows[:, start:start + HISTOGRAM_BLOCK_SIZE]
+            level_db = 20 * np.log10(np.maximum(block, 1e-10, dtype=np.float32))
+            bins = ((level_db - HISTOGRAM_FLOOR_DB) / HISTOGRAM_BIN_DB).astype(np.int64)
+            np.clip(bins, 0, HISTOGRAM_BINS - 1, out=bins)
+
+            # Silent values go to an extra bin per channel that is dropped
+            bins[block <= SILENCE_LEVEL] = HISTOGRAM_BINS
+            bins += np.arange(channels)[:, np.newaxis] * (HISTOGRAM_BINS + 1)
+            binned = np.bincount(bins.ravel(), minlength=channels * (HISTOGRAM_BINS + 1))
+            counts += binned.reshape(channels, HISTOGRAM_BINS + 1)[:, :HISTOGRAM_BINS]
+
+        return self
+
+    def audible(self) -> np.ndarray:
+        """Whether any non-silent envelope value was counted, per channel."""
+        return self.counts.sum(axis=-1) > 0
+
+    def percentile_db(self, percentile: float) -> np.ndarray:
+        """Level (dB) below which the given percentage of envelope values lie, per channel."""
+        cumulative = np.cumsum(self.counts, axis=-1)
+        target = cumulative[..., -1:] * (percentile / 100)
+        index = np.argmax(cumulative >= target, axis=-1)
+        return HISTOGRAM_FLOOR_DB + (index + 0.5) * HISTOGRAM_BIN_DB
+
+    def estimate_threshold_db(self, noise_percentile: float = NOISE_PERCENTILE,
+                              speech_percentile: float = SPEECH_PERCENTILE,
+                              position: float = THRESHOLD_POSITION,
+                              fallback_db: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Estimate a gate threshold per channel.
+
+        Args:
+            noise_percentile: Envelope percentile taken as the noise floor
+            speech_percentile: Envelope percentile taken as the speech level
+            position: Where the threshold sits between noise floor (0) and
+                      speech level (1)
+            fallback_db: Threshold for channels with nothing audible (None =
+                         use the estimate, which then sits at the histogram floor)
+
+        Returns:
+            (threshold_db, noise_floor_db, speech_db), one value per channel
+        """
+        noise_floor_db = self.percentile_db(noise_percentile)
+        speech_db = self.percentile_db(speech_percentile)
+        threshold_db = noise_floor_db + position * (speech_db - noise_floor_db)
+        if fallback_db is not None:
+            threshold_db = np.where(self.audible(), threshold_db, fallback_db)
+        return threshold_db, noise_floor_db, speech_db
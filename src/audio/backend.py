@@ -0,0 +1,265 @@
+"""
+Array backends for the AudioProcessor stages.
+The same stage code runs on numpy arrays or on torch tensors, so a whole
+processing chain can stay in one tensor between load and save.
+"""
+
+import numpy as np
+import torch
+
+from .envelope import EnvelopeDetector, RMS_BLOCK_SIZE
+from .filter_bank import FilterBank
+from .normalization import NORMALIZE_BLOCK_SIZE, measure_levels, scale_clip_blocks
+from .gate_kernel import ramp_gate_control, clamped_run_values
+from .tensor_io import audio_to_tensor, tensor_to_audio
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def stft_blocks(length: int, block_size: int, n_fft: int, hop_length: int):
+    """
+    Split a signal into blocks for block-streamed STFT processing.
+
+    Each block is processed as a segment with at least n_fft samples of
+    real context on both sides, starting on the hop grid, so its frames are
+    exactly the full-signal STFT's frames and the kept samples match a
+    whole-file STFT -> ISTFT to float rounding.
+
+    Yields:
+        (segment_start, segment_stop, block_start, block_stop) sample indices
+    """
+    context = -(-n_fft // hop_length) * hop_length
+    block_size = max(context, -(-block_size // hop_length) * hop_length)
+    for start in range(0, length, block_size):
+        stop = min(length, start + block_size)
+        yield max(0, start - context), min(length, stop + context), start, stop
+
+
+class NumpyBackend:
+    """Stage operations on numpy arrays (each operation returns a new array)."""
+
+    name = "numpy"
+
+    def to_numpy(self, audio: np.ndarray) -> np.ndarray:
+        return audio
+
+    def constant(self, value, like: np.ndarray) -> np.ndarray:
+        """A scalar or small array in the backend's type."""
+        return np.asarray(value)
+
+    def all_finite(self, audio: np.ndarray) -> bool:
+        return bool(np.isfinite(audio).all())
+
+    def nan_to_num(self, audio: np.ndarray) -> np.ndarray:
+        return np.nan_to_num(audio, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def rms(self, audio: np.ndarray) -> float:
+        return measure_levels(audio).rms
+
+    def peak(self, audio: np.ndarray) -> float:
+        return float(max(np.max(audio), -np.min(audio)))
+
+    def scale_clip(self, audio: np.ndarray, factor: float, limit: float) -> np.ndarray:
+        """Multiply by factor and clip to [-limit, limit] (block by block, one output array)."""
+        return scale_clip_blocks(audio, factor, limit)
+
+    def multiply(self, audio: np.ndarray, gain: np.ndarray) -> np.ndarray:
+        return audio * gain
+
+    def envelope(self, audio: np.ndarray, mode: str, window_size: int) -> np.ndarray:
+        return EnvelopeDetector(mode, window_size).process(audio)
+
+    def gate_control(self, above: np.ndarray, attack_samples: int, release_samples: int) -> np.ndarray:
+        """Ramp gate control for an above-threshold mask (the first sample always starts closed)."""
+        control = np.zeros(above.shape, dtype=np.float32)
+        control[..., 1:] = ramp_gate_control(above[..., 1:], attack_samples, release_samples)
+        return control
+
+    def frequency_gain(self, audio: np.ndarray, gain: np.ndarray, n_fft: int, hop_length: int,
+                       block_size: int = None) -> np.ndarray:
+        """
+        Apply a per-bin gain in the STFT domain (output has the input's length).
+        With block_size, only one block's spectrogram is held at a time.
+        """
+        import librosa
+
+        def apply(segment):
+            stft = librosa.stft(segment, n_fft=n_fft, hop_length=hop_length, win_length=n_fft)
+            stft *= gain[:, np.newaxis]
+            return librosa.istft(stft, hop_length=hop_length, win_length=n_fft, length=segment.shape[-1])
+
+        if block_size is None or audio.shape[-1] <= block_size:
+            return apply(audio)
+
+        output = np.empty_like(audio)
+        for seg_start, seg_stop, start, stop in stft_blocks(audio.shape[-1], block_size, n_fft, hop_length):
+            filtered = apply(audio[..., seg_start:seg_stop])
+            output[..., start:stop] = filtered[..., start - seg_start:stop - seg_start]
+        return output
+
+    def filter_bank(self, audio: np.ndarray, sos: np.ndarray, block_size: int = None) -> np.ndarray:
+        """
+        Run a cascade of second-order sections along the samples axis.
+        With block_size, the filter runs block by block with its state carried
+        (same output, block-sized temporaries).
+        """
+        if block_size is None or audio.shape[-1] <= block_size:
+            return FilterBank(sos).process(audio)
+
+        filter_bank = FilterBank(sos)
+        output = np.empty_like(audio)
+        for start in range(0, audio.shape[-1], block_size):
+            output[..., start:start + block_size] = filter_bank.process_block(audio[..., start:start + block_size])
+        return output
+
+
+class TorchBackend:
+    """
+    Stage operations on torch tensors.
+
+    Operations that return audio of the input's shape work in place: the
+    chain owns its tensor, so no stage allocates a second copy of the signal.
+    """
+
+    name = "torch"
+
+    def to_numpy(self, audio: torch.Tensor) -> np.ndarray:
+        return tensor_to_audio(audio)
+
+    def constant(self, value, like: torch.Tensor) -> torch.Tensor:
+        return torch.as_tensor(value, dtype=like.dtype, device=like.device)
+
+    def all_finite(self, audio: torch.Tensor) -> bool:
+        return bool(torch.isfinite(audio).all())
+
+    def nan_to_num(self, audio: torch.Tensor) -> torch.Tensor:
+        return audio.nan_to_num_(nan=0.0, posinf=0.0, neginf=0.0)
+
+    def rms(self, audio: torch.Tensor) -> float:
+        # float64 sum of squares block by block (no signal-sized temporaries)
+        sum_squares = sum(float(torch.dot(block, block)) for block in
+                          (b.double() for b in audio.reshape(-1).split(NORMALIZE_BLOCK_SIZE)))
+        return (sum_squares / max(1, audio.numel())) ** 0.5
+
+    def peak(self, audio: torch.Tensor) -> float:
+        return max(float(audio.max()), -float(audio.min()))
+
+    def scale_clip(self, audio: torch.Tensor, factor: float, limit: float) -> torch.Tensor:
+        return audio.mul_(factor).clamp_(-limit, limit)
+
+    def multiply(self, audio: torch.Tensor, gain: torch.Tensor) -> torch.Tensor:
+        return audio.mul_(gain)
+
+    def envelope(self, audio: torch.Tensor, mode: str, window_size: int) -> torch.Tensor:
+        window_size = max(1, int(window_size))
+        if mode == "rms":
+            return self._sliding_rms(audio, window_size)
+        if mode == "peak":
+            # Same centered, zero padded window as the numpy peak hold
+            magnitude = torch.nn.functional.pad(audio.abs().unsqueeze(-2),
+                                                (window_size // 2, (window_size - 1) // 2))
+            return torch.nn.functional.max_pool1d(magnitude, window_size, stride=1).squeeze(-2)
+
+        # Recursive modes have no torch kernel; run them through numpy
+        logger.debug(f"Envelope mode '{mode}' runs on the CPU")
+        envelope = EnvelopeDetector(mode, window_size).process(tensor_to_audio(audio))
+        return audio_to_tensor(envelope, audio.device)
+
+    def _sliding_rms(self, audio: torch.Tensor, window_size: int) -> torch.Tensor:
+        """Centered running-sum RMS, matching envelope.sliding_rms."""
+        n = audio.shape[-1]
+        half = (window_size - 1) // 2
+        out = torch.empty_like(audio)
+
+        for block_start in range(0, n, RMS_BLOCK_SIZE):
+            block_stop = min(block_start + RMS_BLOCK_SIZE, n)
+
+            # Input span covering every window centred in this block (zero padded)
+            lo = block_start + half + 1 - window_size
+            hi = block_stop + half
+            squared = torch.zeros(audio.shape[:-1] + (hi - lo,), dtype=torch.float64, device=audio.device)
+            squared[..., max(lo, 0) - lo:min(hi, n) - lo] = audio[..., max(lo, 0):min(hi, n)]
+            squared *= squared
+
+            sums = torch.nn.functional.pad(torch.cumsum(squared, dim=-1), (1, 0))
+            mean_square = (sums[..., window_size:] - sums[..., :-window_size]).clamp_(min=0.0)
+            out[..., block_start:block_stop] = (mean_square / window_size).sqrt_()
+
+        return out
+
+    def gate_control(self, above: torch.Tensor, attack_samples: int, release_samples: int) -> torch.Tensor:
+        """Ramp gate control built on the device; only the run start values are computed on the CPU."""
+        control = torch.zeros(above.shape, dtype=torch.float32, device=above.device)
+        rows = above.reshape(-1, above.shape[-1])
+        for row, row_control in zip(rows, control.view(-1, above.shape[-1])):
+            row_control[1:] = self._ramp(row[1:], attack_samples, release_samples)
+        return control
+
+    def _ramp(self, above: torch.Tensor, attack_samples: int, release_samples: int) -> torch.Tensor:
+        """Torch version of gate_kernel.ramp_gate_control for one row."""
+        n = above.shape[-1]
+        if n == 0:
+            return torch.zeros(0, dtype=torch.float32, device=above.device)
+
+        attack_step = 1.0 / attack_samples if attack_samples > 0 else 1.0
+        release_step = 1.0 / release_samples if release_samples > 0 else 1.0
+
+        # Run boundaries and per-run slope
+        changes = torch.nonzero(above[1:] != above[:-1]).flatten() + 1
+        starts = torch.cat((torch.zeros(1, dtype=changes.dtype, device=above.device), changes))
+        lengths = torch.diff(starts, append=torch.tensor([n], device=above.device))
+        steps = torch.where(above[starts], attack_step, -release_step).double()
+
+        run_values = torch.from_numpy(clamped_run_values((steps * lengths).tolist())).to(above.device)
+
+        # Fill every ramp at once: value = run_value + step * (i - start + 1)
+        offsets = run_values - steps * (starts - 1)
+        control = torch.arange(n, dtype=torch.float64, device=above.device)
+        control *= torch.repeat_interleave(steps, lengths)
+        control += torch.repeat_interleave(offsets, lengths)
+        return control.clamp_(0.0, 1.0).float()
+
+    def frequency_gain(self, audio: torch.Tensor, gain: np.ndarray, n_fft: int, hop_length: int,
+                       block_size: int = None) -> torch.Tensor:
+        window = torch.hann_window(n_fft, device=audio.device)
+        gain = self.constant(gain, audio).unsqueeze(-1)
+
+        def apply(segment):
+            stft = torch.stft(segment, n_fft=n_fft, hop_length=hop_length, win_length=n_fft, window=window,
+                              center=True, pad_mode="constant", return_complex=True)
+            stft *= gain
+            return torch.istft(stft, n_fft=n_fft, hop_length=hop_length, win_length=n_fft, window=window,
+                               center=True, length=segment.shape[-1])
+
+        if block_size is None or audio.shape[-1] <= block_size:
+            return apply(audio)
+
+        # In place, block by block: the unfiltered tail of each block is kept as the next block's left context
+        context = -(-n_fft // hop_length) * hop_length
+        tail = audio[..., :0]
+        for seg_start, seg_stop, start, stop in stft_blocks(audio.shape[-1], block_size, n_fft, hop_length):
+            segment = torch.cat([tail, audio[..., start:seg_stop]], dim=-1)
+            filtered = apply(segment)[..., start - seg_start:stop - seg_start]
+            tail = audio[..., max(0, stop - context):stop].clone()
+            audio[..., start:stop] = filtered
+        return audio
+
+    def filter_bank(self, audio: torch.Tensor, sos: np.ndarray, block_size: int = None) -> torch.Tensor:
+        # In place, one block at a time through numpy (only a block is copied off the device at once)
+        filter_bank = FilterBank(sos)
+        block_size = audio.shape[-1] if block_size is None else block_size
+        for start in range(0, audio.shape[-1], block_size):
+            block = audio[..., start:start + block_size]
+            filtered = filter_bank.process_block(tensor_to_audio(block))
+            block.copy_(audio_to_tensor(filtered, audio.device))
+        return audio
+
+
+_NUMPY = NumpyBackend()
+_TORCH = TorchBackend()
+
+
+def get_backend(audio):
+    """Backend matching the audio's array type."""
+    return _TORCH if torch.is_tensor(audio) else _NUMPY
@@ -0,0 +1,188 @@
+"""
+Chunked spectral gating (the fallback noise reduction engine).
+Same stationary algorithm as noisereduce's reduce_noise, with the noise
+threshold computed once and the signal processed in overlapping chunks on a
+thread pool, then crossfaded back together.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.signal import fftconvolve, istft, stft
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Noise statistics use at most this many samples (noisereduce's clip_noise_stationary length)
+NOISE_STATS_SAMPLES = 600000
+
+# Context around each chunk, in samples (noisereduce's reduce_noise padding). With the same padding, and
+# chunks starting on multiples of the hop, every chunk's STFT frames sit on reduce_noise's frame grid
+DEFAULT_PADDING = 30000
+
+
+def _amp_to_db(x: np.ndarray, top_db: float = 80.0) -> np.ndarray:
+    """Magnitude in dB, floored top_db below each bin's maximum (as noisereduce computes it)."""
+    x_db = 20 * np.log10(np.abs(x) + np.finfo(np.float64).eps)
+    return np.maximum(x_db, np.max(x_db, axis=-1, keepdims=True) - top_db)
+
+
+def _triangle(n_grad: int) -> np.ndarray:
+    """Triangular smoothing window spanning n_grad steps on each side."""
+    return np.concatenate([np.linspace(0, 1, n_grad + 1, endpoint=False),
+                           np.linspace(1, 0, n_grad + 2)])[1:-1]
+
+
+class ChunkedSpectralGate:
+    """
+    Spectral gate that splits long signals into overlapping chunks.
+
+    Each chunk is gated with padding samples of context on both sides and
+    neighbouring chunks overlap by crossfade_ms, so chunk boundaries are
+    not audible. Stationary gating thresholds every chunk against the same
+    noise statistics; nonstationary gating runs noisereduce per chunk (its
+    noise floor is local anyway).
+    """
+
+    def __init__(self, sr: int, stationary: bool = True, prop_decrease: float = 1.0, n_fft: int = 1024,
+                 win_length: Optional[int] = None, hop_length: Optional[int] = None,
+                 n_std_thresh_stationary: float = 1.5, freq_mask_smooth_hz: Optional[float] = 500,
+                 time_mask_smooth_ms: Optional[float] = 50, chunk_seconds: float = 30.0,
+                 padding: int = DEFAULT_PADDING, crossfade_ms: float = 50.0, jobs: Optional[int] = None,
+                 **nonstationary_settings):
+        """
+        Initialize the gate.
+
+        Args:
+            sr: Sample rate of the audio
+            stationary: True = fixed noise threshold per frequency, False = noisereduce's nonstationary gate
+            prop_decrease: Proportion of the noise removed (0.0 to 1.0)
+            n_fft: STFT size
+            win_length: STFT window length (None = n_fft)
+            hop_length: STFT hop (None = win_length // 4)
+            n_std_thresh_stationary: Standard deviations above the noise mean counted as signal
+            freq_mask_smooth_hz: Mask smoothing across frequency (None = none)
+            time_mask_smooth_ms: Mask smoothing across time (None = none)
+            chunk_seconds: Audio per chunk (rounded up to a whole number of hops)
+            padding: Samples of context processed on each side of a chunk and discarded
+            crossfade_ms: Overlap between neighbouring chunks
+            jobs: Worker threads (None = one per core)
+            **nonstationary_settings: Extra noisereduce settings for nonstationary mode
+        """
+        self.sr = sr
+        self.stationary = stationary
+        self.prop_decrease = prop_decrease
+        self.n_fft = n_fft
+        self.win_length = n_fft if win_length is None else win_length
+        self.hop_length = self.win_length // 4 if hop_length is None else hop_length
+        self.n_std_thresh_stationary = n_std_thresh_stationary
+        self.freq_mask_smooth_hz = freq_mask_smooth_hz
+        self.time_mask_smooth_ms = time_mask_smooth_ms
+        self.chunk_size = -(-max(1, int(chunk_seconds * sr)) // self.hop_length) * self.hop_length
+        self.padding = max(0, int(padding))
+        self.crossfade = max(1, min(self.chunk_size, int(crossfade_ms * sr / 1000)))
+        self.jobs = jobs or os.cpu_count() or 1
+        self.nonstationary_settings = nonstationary_settings
+
+        n_grad_freq = 1 if freq_mask_smooth_hz is None else int(freq_mask_smooth_hz / (sr / (n_fft / 2)))
+        n_grad_time = (1 if time_mask_smooth_ms is None
+                       else int(time_mask_smooth_ms / ((self.hop_length / sr) * 1000)))
+        if n_grad_freq < 1 or n_grad_time < 1:
+            raise ValueError("Mask smoothing is shorter than one STFT bin/frame")
+        if n_grad_freq == 1 and n_grad_time == 1:
+            self.smoothing_filter = None
+        else:
+            smoothing_filter = np.outer(_triangle(n_grad_freq), _triangle(n_grad_time))
+            self.smoothing_filter = smoothing_filter / smoothing_filter.sum()
+
+    def _stft(self, y: np.ndarray) -> np.ndarray:
+        """Complex STFT (scipy, unpadded, as noisereduce calls it)."""
+        _, _, Y = stft(y, nfft=self.n_fft, noverlap=self.win_length - self.hop_length,
+                       nperseg=self.win_length, padded=False)
+        return Y
+
+    def noise_threshold(self, y_noise: np.ndarray) -> np.ndarray:
+        """Per-frequency dB threshold from a noise reference."""
+        noise_db = _amp_to_db(self._stft(y_noise[:NOISE_STATS_SAMPLES]))
+        return noise_db.mean(axis=1) + noise_db.std(axis=1) * self.n_std_thresh_stationary
+
+    def _gate(self, chunk: np.ndarray, noise_thresh: Optional[np.ndarray]) -> np.ndarray:
+        """Gate one (padded) chunk."""
+        if not self.stationary:
+            import noisereduce as nr
+
+            return nr.reduce_noise(y=chunk, sr=self.sr, stationary=False, prop_decrease=self.prop_decrease,
+                                   n_fft=self.n_fft, win_length=self.win_length, hop_length=self.hop_length,
+                                   freq_mask_smooth_hz=self.freq_mask_smooth_hz,
+                                   time_mask_smooth_ms=self.time_mask_smooth_ms,
+                                   chunk_size=None, padding=0, **self.nonstationary_settings)
+
+        X = self._stft(chunk)
+        sig_mask = _amp_to_db(X) > noise_thresh[:, None]
+        sig_mask = sig_mask * self.prop_decrease + (1.0 - self.prop_decrease)
+        if self.smoothing_filter is not None:
+            sig_mask = fftconvolve(sig_mask, self.smoothing_filter, mode="same")
+
+        _, denoised = istft(X * sig_mask, nfft=self.n_fft, noverlap=self.win_length - self.hop_length,
+                            nperseg=self.win_length)
+        out = np.zeros(len(chunk), dtype=chunk.dtype)
+        out[:min(len(chunk), len(denoised))] = denoised[:len(chunk)]
+        return out
+
+    def _process_chunk(self, y: np.ndarray, start: int, stop: int,
+                       noise_thresh: Optional[np.ndarray]) -> Tuple[np.ndarray, float]:
+        """Gate samples [start, stop) with padding (zeros past the ends); returns (output, seconds taken)."""
+        began = time.perf_counter()
+        lo, hi = start - self.padding, stop + self.padding
+        chunk = np.zeros(hi - lo, dtype=y.dtype)
+        chunk[max(0, lo) - lo:min(len(y), hi) - lo] = y[max(0, lo):min(len(y), hi)]
+        out = self._gate(chunk, noise_thresh)[self.padding:self.padding + stop - start]
+        return out, time.perf_counter() - began
+
+    def __call__(self, y: np.ndarray, y_noise: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Denoise a mono signal.
+
+        Args:
+            y: Audio (samples)
+            y_noise: Optional noise reference for the stationary threshold (None = y itself)
+
+        Returns:
+            Denoised audio, same length and dtype as y
+        """
+        noise_thresh = self.noise_threshold(y if y_noise is None else y_noise) if self.stationary else None
+
+        # Chunk k covers [k * chunk_size, (k + 1) * chunk_size + crossfade)
+        n = len(y)
+        spans = [(start, min(n, start + self.chunk_size + self.crossfade))
+                 for start in range(0, max(1, n - self.crossfade), self.chunk_size)]
+        if len(spans) == 1:
+            out, elapsed = self._process_chunk(y, 0, n, noise_thresh)
+            logger.debug(f"Spectral gate: 1 chunk in {elapsed:.2f}s")
+            return out
+
+        fade_in = (np.arange(self.crossfade, dtype=np.float32) + 0.5) / max(1, self.crossfade)
+        output = np.zeros(n, dtype=y.dtype)
+        timings = []
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(self.jobs, len(spans))) as pool:
+            results = pool.map(lambda span: self._process_chunk(y, span[0], span[1], noise_thresh), spans)
+            for index, ((start, stop), (piece, elapsed)) in enumerate(zip(spans, results)):
+                # Linear crossfade over the overlap with the previous chunk (weights sum to 1)
+                if index > 0:
+                    piece[:self.crossfade] *= fade_in
+                if index < len(spans) - 1:
+                    piece[-self.crossfade:] *= fade_in[::-1]
+                output[start:stop] += piece
+                timings.append(elapsed)
+                logger.debug(f"Spectral gate chunk {index + 1}/{len(spans)}: "
+                             f"{(stop - start) / self.sr:.1f}s of audio in {elapsed:.2f}s")
+
+        logger.info(f"Spectral gate: {len(spans)} chunks on {min(self.jobs, len(spans))} threads in "
+                    f"{time.perf_counter() - began:.2f}s (per chunk: mean {np.mean(timings):.2f}s, "
+                    f"max {max(timings):.2f}s)")
+        return output
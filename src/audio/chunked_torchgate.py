@@ -0,0 +1,335 @@
+"""
+Chunked overlap-add TorchGate.
+Runs a TorchGate module over overlapping windows so peak memory depends on
+the chunk size instead of the recording length.
+"""
+
+from typing import Optional
+
+import torch
+from noisereduce.torchgate.utils import amp_to_db
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Approximate TorchGate working set per input sample (STFT, dB copy, mask, ISTFT)
+TORCHGATE_BYTES_PER_SAMPLE = 128
+
+# Same clamp TorchGate applies to its dB spectrogram
+TOP_DB = 40
+
+# Mask precisions selectable through TORCHGATE_SETTINGS["precision"]
+MASK_DTYPES = {"float32": torch.float32, "bfloat16": torch.bfloat16}
+
+# Audio compared between float32 and reduced precision before a reduced-precision run
+PRECISION_CHECK_SECONDS = 10.0
+
+
+def torchgate_chunk_samples(chunk_size_bytes: int, max_memory_gb: float, channels: int = 1) -> int:
+    """
+    Chunk length (samples) for a chunk size and memory budget.
+
+    Args:
+        chunk_size_bytes: Input audio per chunk in bytes (float32 samples)
+        max_memory_gb: Memory budget for one chunk's working set
+        channels: Channels processed together
+
+    Returns:
+        Samples per chunk
+    """
+    budget = int(max_memory_gb * 1024 ** 3 / (TORCHGATE_BYTES_PER_SAMPLE * max(1, channels)))
+    return max(1, min(chunk_size_bytes // 4, budget))
+
+
+def stationary_mask(X_abs: torch.Tensor, floor_db: torch.Tensor, noise_thresh: torch.Tensor,
+                    prop_decrease: float, smoothing_filter: Optional[torch.Tensor]) -> torch.Tensor:
+    """Smoothed stationary TorchGate mask for a magnitude spectrogram (batch, freq, frames)."""
+    X_db = torch.maximum(20 * torch.log10(X_abs + torch.finfo(torch.float64).eps), floor_db)
+    sig_mask = torch.gt(X_db, noise_thresh.unsqueeze(-1)).to(X_abs.dtype)
+    sig_mask = prop_decrease * (sig_mask - 1.0) + 1.0
+    if smoothing_filter is not None:
+        sig_mask = torch.nn.functional.conv2d(
+            sig_mask.unsqueeze(1), smoothing_filter.to(sig_mask.dtype), padding="same"
+        ).squeeze(1)
+    return sig_mask
+
+
+_compiled_stationary_mask = None
+
+
+def compiled_stationary_mask():
+    """stationary_mask compiled with torch.compile (built once per process)."""
+    global _compiled_stationary_mask
+    if _compiled_stationary_mask is None:
+        _compiled_stationary_mask = torch.compile(stationary_mask, dynamic=True)
+    return _compiled_stationary_mask
+
+
+def exceeds_memory_budget(num_samples: int, max_memory_gb: float, channels: int = 1) -> bool:
+    """True if a single TorchGate pass over the signal would exceed the memory budget."""
+    return num_samples * max(1, channels) * TORCHGATE_BYTES_PER_SAMPLE > max_memory_gb * 1024 ** 3
+
+
+class ChunkedTorchGate:
+    """Applies a TorchGate module chunk by chunk with crossfaded overlaps."""
+
+    def __init__(self, tg: torch.nn.Module, chunk_samples: int):
+        """
+        Initialize the chunked runner.
+
+        Every chunk is processed with enough context on both sides that its
+        STFT frames, mask smoothing and ISTFT overlap match a single pass;
+        stationary noise statistics are gathered over the whole signal first.
+        The output therefore matches tg(x) up to float rounding.
+
+        For a torch.compile'd module the stationary mask runs compiled too.
+
+        Args:
+            tg: Configured TorchGate module (plain or compiled)
+            chunk_samples: Output samples per chunk (rounded to the STFT hop)
+        """
+        self.tg = tg
+        self.mask = compiled_stationary_mask() if hasattr(tg, "_orig_mod") else stationary_mask
+        hop = tg.hop_length
+
+        # Frames a chunk edge can disturb: STFT/ISTFT window, mask smoothing, moving average
+        context_frames = -(-tg.n_fft // hop) + 1
+        if tg.smoothing_filter is not None:
+            context_frames += tg.smoothing_filter.shape[-1] // 2 + 1
+        if tg.nonstationary:
+            context_frames += tg.n_movemean_nonstationary // 2 + 1
+
+        self.context = context_frames * hop
+        self.half_fade = max(1, context_frames // 2) * hop
+        fade = 2 * self.half_fade
+        self.chunk_samples = max(2 * fade, chunk_samples // hop * hop)
+
+    def _stft(self, x: torch.Tensor) -> torch.Tensor:
+        tg = self.tg
+        return torch.stft(
+            x, n_fft=tg.n_fft, hop_length=tg.hop_length, win_length=tg.win_length,
+            return_complex=True, pad_mode="constant", center=True,
+            window=torch.hann_window(tg.win_length).to(x.device),
+        )
+
+    def _istft(self, Y: torch.Tensor) -> torch.Tensor:
+        tg = self.tg
+        return torch.istft(
+            Y, n_fft=tg.n_fft, hop_length=tg.hop_length, win_length=tg.win_length,
+            center=True, window=torch.hann_window(tg.win_length).to(Y.device),
+        )
+
+    def _boundaries(self, n: int) -> list:
+        """Chunk boundaries (multiples of the hop); a short tail joins the previous chunk."""
+        boundaries = list(range(0, n, self.chunk_samples))
+        if len(boundaries) > 1 and n - boundaries[-1] < 2 * self.half_fade:
+            boundaries.pop()
+        return boundaries + [n]
+
+    def _chunk_spectra(self, x: torch.Tensor, emit: bool = False):
+        """Yield (chunk index, input start, input STFT, core frame slice) for every chunk."""
+        hop = self.tg.hop_length
+        n = x.shape[-1]
+        boundaries = self._boundaries(n)
+        margin = self.context + (self.half_fade if emit else 0)
+
+        for index in range(len(boundaries) - 1):
+            start, stop = boundaries[index], boundaries[index + 1]
+            in_start = max(0, start - margin)
+            in_stop = min(n, stop + margin)
+            X = self._stft(x[..., in_start:in_stop])
+
+            # Frames centred in the core [start, stop); the last chunk keeps the final frame
+            first = (start - in_start) // hop
+            last = X.shape[-1] if stop == n else first + -(-(stop - start) // hop)
+            yield index, in_start, X, slice(first, last)
+
+    @torch.inference_mode()
+    def _stationary_threshold(self, x: torch.Tensor, xn: Optional[torch.Tensor]):
+        """Global per-frequency dB floor and noise threshold, gathered chunk by chunk."""
+        tg = self.tg
+
+        # Peak level per frequency over the whole signal (sets the top_db clamp)
+        max_db = None
+        for _, _, X, core in self._chunk_spectra(x):
+            chunk_max = (20 * torch.log10(X[..., core].abs() + torch.finfo(torch.float64).eps)).amax(-1)
+            max_db = chunk_max if max_db is None else torch.maximum(max_db, chunk_max)
+        floor_db = (max_db - TOP_DB).unsqueeze(-1)
+
+        if xn is not None:
+            std_noise, mean_noise = torch.std_mean(amp_to_db(self._stft(xn)).to(dtype=floor_db.dtype), dim=-1)
+            return floor_db, mean_noise + std_noise * tg.n_std_thresh_stationary
+
+        # Mean and standard deviation of the clamped dB spectrogram
+        total = torch.zeros_like(max_db, dtype=torch.float64)
+        total_sq = torch.zeros_like(total)
+        count = 0
+        for _, _, X, core in self._chunk_spectra(x):
+            X_db = torch.maximum(20 * torch.log10(X[..., core].abs() + torch.finfo(torch.float64).eps),
+                                 floor_db).to(torch.float64)
+            total += X_db.sum(-1)
+            total_sq += (X_db * X_db).sum(-1)
+            count += X_db.shape[-1]
+
+        mean_noise = total / count
+        std_noise = ((total_sq - total * mean_noise) / max(1, count - 1)).clamp_min(0).sqrt()
+        return floor_db, (mean_noise + std_noise * tg.n_std_thresh_stationary).to(floor_db.dtype)
+
+    @torch.inference_mode()
+    def __call__(self, x: torch.Tensor, xn: Optional[torch.Tensor] = None,
+                 mask_dtype: torch.dtype = torch.float32) -> torch.Tensor:
+        """
+        Denoise x (batch, samples) like tg(x, xn), one chunk at a time.
+
+        Args:
+            x: Audio tensor (batch, samples)
+            xn: Optional noise clip for stationary statistics
+            mask_dtype: Precision of the stationary magnitude/mask computation;
+                        the STFT, ISTFT and noise statistics stay in float32
+
+        Returns:
+            Denoised audio with the same length tg(x) produces
+        """
+        tg = self.tg
+        hop = tg.hop_length
+        n = x.shape[-1]
+        n_out = n // hop * hop
+
+        if not tg.nonstationary:
+            floor_db, noise_thresh = self._stationary_threshold(x, xn)
+            floor_db, noise_thresh = floor_db.to(mask_dtype), noise_thresh.to(mask_dtype)
+
+        fade = 2 * self.half_fade
+        fade_in = (torch.arange(fade, device=x.device, dtype=x.dtype) + 0.5) / fade
+        boundaries = self._boundaries(n)
+        output = torch.zeros(x.shape[:-1] + (n_out,), dtype=x.dtype, device=x.device)
+
+        for index, in_start, X, _ in self._chunk_spectra(x, emit=True):
+            # Same masking as TorchGate.forward, with global stationary statistics
+            if tg.nonstationary:
+                sig_mask = tg.prop_decrease * (tg._nonstationary_mask(X.abs()) * 1.0 - 1.0) + 1.0
+                if tg.smoothing_filter is not None:
+                    sig_mask = torch.nn.functional.conv2d(
+                        sig_mask.unsqueeze(1), tg.smoothing_filter.to(sig_mask.dtype), padding="same"
+                    ).squeeze(1)
+            else:
+                sig_mask = self.mask(X.abs().to(mask_dtype), floor_db, noise_thresh, tg.prop_decrease,
+                                     tg.smoothing_filter).to(X.real.dtype)
+            y = self._istft(X * sig_mask)
+
+            # Emit the core plus half a crossfade on each inner side
+            first = index == 0
+            final = index == len(boundaries) - 2
+            emit_start = 0 if first else boundaries[index] - self.half_fade
+            emit_stop = n_out if final else boundaries[index + 1] + self.half_fade
+            segment = y[..., emit_start - in_start:emit_stop - in_start].to(x.dtype)
+
+            if not first:
+                segment[..., :fade] *= fade_in
+            if not final:
+                segment[..., -fade:] *= fade_in.flip(0)
+            output[..., emit_start:emit_stop] += segment
+
+        return output
+
+
+def reduced_precision_supported(dtype: torch.dtype, device: torch.device) -> bool:
+    """True if the device runs the dtype natively (bfloat16 on CPU needs AVX512-BF16/AMX)."""
+    if dtype == torch.float32 or device.type == "cuda":
+        return True
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def spectral_deviation(reference: torch.Tensor, candidate: torch.Tensor, n_fft: int, hop_length: int) -> float:
+    """Relative magnitude-spectrum error of candidate against reference (0 = identical)."""
+    window = torch.hann_window(n_fft, device=reference.device)
+    ref = torch.stft(reference, n_fft, hop_length, window=window, return_complex=True).abs()
+    cand = torch.stft(candidate, n_fft, hop_length, window=window, return_complex=True).abs()
+    return float(torch.linalg.vector_norm(cand - ref) / torch.linalg.vector_norm(ref).clamp_min(1e-12))
+
+
+@torch.inference_mode()
+def choose_mask_dtype(tg: torch.nn.Module, x: torch.Tensor, xn: Optional[torch.Tensor],
+                      precision: str, tolerance: float) -> torch.dtype:
+    """
+    Mask precision for a run, checked against float32 on a sample window.
+
+    The window (PRECISION_CHECK_SECONDS from the middle of x) is gated at
+    both precisions; float32 is used if the device lacks native support or
+    the outputs' spectral deviation exceeds the tolerance.
+
+    Args:
+        tg: Configured TorchGate module
+        x: Audio tensor (batch, samples)
+        xn: Optional noise clip for stationary statistics
+        precision: Requested precision ("float32" or "bfloat16")
+        tolerance: Maximum accepted spectral deviation
+
+    Returns:
+        dtype for the mask computation
+    """
+    dtype = MASK_DTYPES.get(precision)
+    if dtype is None:
+        logger.warning(f"Unknown TorchGate precision '{precision}', using float32")
+        return torch.float32
+    if dtype == torch.float32:
+        return dtype
+    if tg.nonstationary:
+        logger.info("Reduced precision applies to the stationary mask only, using float32")
+        return torch.float32
+    if not reduced_precision_supported(dtype, x.device):
+        logger.info(f"{precision} is not supported natively on this CPU, using float32")
+        return torch.float32
+
+    window = int(PRECISION_CHECK_SECONDS * tg.sr)
+    start = max(0, (x.shape[-1] - window) // 2)
+    sample = x[..., start:start + window]
+    runner = ChunkedTorchGate(tg, sample.shape[-1])
+    deviation = spectral_deviation(runner(sample, xn), runner(sample, xn, dtype), tg.n_fft, tg.hop_length)
+
+    if deviation > tolerance:
+        logger.warning(f"{precision} TorchGate deviates {deviation:.4f} from float32 "
+                       f"(tolerance {tolerance}), using float32")
+        return torch.float32
+
+    logger.debug(f"{precision} TorchGate deviation {deviation:.4f} within tolerance {tolerance}")
+    return dtype
+
+
+def run_torchgate(tg: torch.nn.Module, x: torch.Tensor, chunk_size_bytes: int, max_memory_gb: float,
+                  xn: Optional[torch.Tensor] = None, precision: str = "float32",
+                  precision_tolerance: float = 0.02) -> torch.Tensor:
+    """
+    Run TorchGate in one pass, or chunked when one pass would exceed the memory budget.
+    Runs under torch.inference_mode (no autograd tracking).
+
+    Args:
+        tg: Configured TorchGate module
+        x: Audio tensor (batch, samples)
+        chunk_size_bytes: Input audio per chunk in bytes (CHUNK_SIZE)
+        max_memory_gb: Memory budget (MAX_MEMORY_USAGE_GB)
+        xn: Optional noise clip for stationary statistics
+        precision: Mask precision ("float32" or "bfloat16", guarded by choose_mask_dtype)
+        precision_tolerance: Maximum spectral deviation accepted for reduced precision
+
+    Returns:
+        Denoised audio tensor
+    """
+    channels = x.shape[0]
+    mask_dtype = choose_mask_dtype(tg, x, xn, precision, precision_tolerance)
+    within_budget = not exceeds_memory_budget(x.shape[-1], max_memory_gb, channels)
+
+    if within_budget and mask_dtype == torch.float32:
+        with torch.inference_mode():
+            return tg(x, xn)
+
+    # Reduced precision always goes through the chunked runner (a single chunk when within budget)
+    chunk_samples = x.shape[-1] if within_budget else torchgate_chunk_samples(chunk_size_bytes, max_memory_gb,
+                                                                              channels)
+    if not within_budget:
+        logger.info(f"Chunked TorchGate: {x.shape[-1]} samples in chunks of {chunk_samples}")
+    return ChunkedTorchGate(tg, chunk_samples)(x, xn, mask_dtype)
@@ -0,0 +1,65 @@
+"""
+Compiled TorchGate execution.
+Wraps a TorchGate module with torch.compile and warms it up, so the compile
+cost is paid once per worker process instead of on the first real file.
+"""
+
+import os
+import time
+from typing import Optional
+
+import torch
+
+from ..utils.logger import get_logger
+from .chunked_torchgate import ChunkedTorchGate
+
+logger = get_logger(__name__)
+
+# Length of the warm-up input (seconds of audio)
+WARMUP_SECONDS = 2.0
+
+
+def compile_torchgate(tg: torch.nn.Module, sample_rate: int, cache_dir: Optional[str] = None) -> torch.nn.Module:
+    """
+    Compile a TorchGate module and run it once on a warm-up signal.
+
+    The module is compiled with dynamic shapes, so files of any length reuse
+    the same compiled graph; the warm-up also compiles the chunked runner's
+    stationary mask, used for files over the memory budget. Inductor keeps
+    its compiled kernels in an on-disk cache; later worker processes load
+    them instead of recompiling.
+    TorchScript is not an option here: torch.jit.script rejects TorchGate's
+    nonstationary mask (it calls a free conv1d function).
+
+    Args:
+        tg: Configured TorchGate module
+        sample_rate: Sample rate the module was built for
+        cache_dir: Directory for Inductor's compiled-kernel cache (None = torch default)
+
+    Returns:
+        Compiled module, or tg unchanged if compilation is not available
+    """
+    if not hasattr(torch, "compile"):
+        logger.warning("torch.compile is not available, running TorchGate eagerly")
+        return tg
+
+    if cache_dir:
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_dir))
+
+    try:
+        compiled = torch.compile(tg, dynamic=True)
+
+        # Warm-up under the same mode run_torchgate uses, so the guards match real calls
+        device = next(tg.buffers(), torch.empty(0)).device
+        warmup = torch.randn(1, int(WARMUP_SECONDS * sample_rate), device=device) * 0.01
+        start = time.time()
+        with torch.inference_mode():
+            compiled(warmup)
+            if not tg.nonstationary:
+                ChunkedTorchGate(compiled, warmup.shape[-1] // 4)(warmup)
+        logger.info(f"Compiled TorchGate (sr={sample_rate}) in {time.time() - start:.1f}s")
+        return compiled
+
+    except Exception as e:
+        logger.warning(f"Could not compile TorchGate, running it eagerly: {e}")
+        return tg
@@ -0,0 +1,224 @@
+"""
+Envelope detectors shared by the noise gate stages.
+All modes run in O(N) regardless of window size and produce float32 output.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# Supported detector modes
+ENVELOPE_MODES = ("rms", "exp_rms", "peak")
+
+# Samples per float64 working block for the running-sum RMS
+RMS_BLOCK_SIZE = 1 << 18
+
+
+def _output_buffer(audio: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """Return a preallocated output buffer or a new float32 one."""
+    if out is None:
+        return np.empty(audio.shape, dtype=np.float32)
+    if out.shape != audio.shape:
+        raise ValueError(f"Output buffer shape {out.shape} does not match audio shape {audio.shape}")
+    return out
+
+
+def sliding_rms(audio: np.ndarray, window_size: int, out: Optional[np.ndarray] = None,
+                block_size: int = RMS_BLOCK_SIZE) -> np.ndarray:
+    """
+    Centered sliding-window RMS using running sums.
+
+    Matches np.sqrt(np.convolve(audio ** 2, np.ones(w) / w, mode='same'))
+    (zero padded at the edges) but costs O(N) instead of O(N*w). The running
+    sums are kept in float64 per block so precision does not degrade on
+    multi-hour signals.
+
+    Args:
+        audio: Audio data, samples along the last axis
+        window_size: RMS window length in samples
+        out: Optional preallocated output buffer (same shape as audio)
+        block_size: Samples processed per working block
+
+    Returns:
+        RMS envelope (float32 unless out has another dtype)
+    """
+    audio = np.asarray(audio)
+    out = _output_buffer(audio, out)
+    n = audio.shape[-1]
+    window_size = max(1, int(window_size))
+    half = (window_size - 1) // 2
+
+    for block_start in range(0, n, block_size):
+        block_stop = min(block_start + block_size, n)
+
+        # Input span covering every window centred in this block (zero padded)
+        lo = block_start + half + 1 - window_size
+        hi = block_stop + half
+        squared = np.zeros(audio.shape[:-1] + (hi - lo,))
+        squared[..., max(lo, 0) - lo:min(hi, n) - lo] = audio[..., max(lo, 0):min(hi, n)]
+        squared *= squared
+
+        sums = np.zeros(squared.shape[:-1] + (squared.shape[-1] + 1,))
+        np.cumsum(squared, axis=-1, out=sums[..., 1:])
+
+        mean_square = sums[..., window_size:] - sums[..., :-window_size]
+        np.maximum(mean_square, 0.0, out=mean_square)
+        mean_square /= window_size
+        np.sqrt(mean_square, out=out[..., block_start:block_stop], casting='same_kind')
+
+    return out
+
+
+def exponential_rms(audio: np.ndarray, window_size: int,
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Exponentially weighted RMS (one-pole filter on the squared signal).
+
+    The smoothing coefficient 2 / (window_size + 1) gives the same effective
+    averaging length as a sliding window of window_size samples.
+
+    Args:
+        audio: Audio data, samples along the last axis
+        window_size: Equivalent averaging length in samples
+        out: Optional preallocated output buffer (same shape as audio)
+
+    Returns:
+        RMS envelope (float32 unless out has another dtype)
+    """
+    audio = np.asarray(audio)
+    out = _output_buffer(audio, out)
+    _exponential_rms_block(audio, window_size, np.zeros(audio.shape[:-1] + (1,)), out)
+    return out
+
+
+def _exponential_rms_block(audio: np.ndarray, window_size: int, zi: np.ndarray,
+                           out: np.ndarray) -> np.ndarray:
+    """Run the exponential RMS filter from state zi and return the final state."""
+    from scipy.signal import lfilter
+
+    alpha = 2.0 / (max(1, int(window_size)) + 1)
+    np.square(audio, out=out, casting='same_kind')
+    filtered, zf = lfilter([alpha], [1.0, alpha - 1.0], out, axis=-1, zi=zi)
+    out[...] = filtered
+    np.sqrt(out, out=out)
+    return zf
+
+
+def peak_hold(audio: np.ndarray, window_size: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Centered sliding-window peak (maximum absolute value).
+
+    Uses the same window alignment as sliding_rms so the modes are
+    interchangeable.
+
+    Args:
+        audio: Audio data, samples along the last axis
+        window_size: Hold window length in samples
+        out: Optional preallocated output buffer (same shape as audio)
+
+    Returns:
+        Peak envelope (float32 unless out has another dtype)
+    """
+    from scipy.ndimage import maximum_filter1d
+
+    audio = np.asarray(audio)
+    out = _output_buffer(audio, out)
+    magnitude = np.abs(audio).astype(out.dtype, copy=False)
+    maximum_filter1d(magnitude, size=max(1, int(window_size)), axis=-1,
+                     output=out, mode='constant', cval=0.0)
+    return out
+
+
+class EnvelopeDetector:
+    """Level detector used by the noise gates."""
+
+    def __init__(self, mode: str = "rms", window_size: int = 1024):
+        """
+        Initialize the envelope detector.
+
+        Args:
+            mode: "rms" (sliding running-sum RMS), "exp_rms" (exponential RMS)
+                  or "peak" (sliding peak hold)
+            window_size: Window length in samples
+        """
+        if mode not in ENVELOPE_MODES:
+            raise ValueError(f"Unknown envelope mode '{mode}', expected one of {ENVELOPE_MODES}")
+        self.mode = mode
+        self.window_size = max(1, int(window_size))
+        self.reset()
+
+    @property
+    def latency(self) -> int:
+        """Samples of look-ahead process_block needs before emitting a value."""
+        return 0 if self.mode == "exp_rms" else (self.window_size - 1) // 2
+
+    def reset(self) -> None:
+        """Clear the streaming state."""
+        self._history = None
+        self._history_start = 0
+        self._received = 0
+        self._emitted = 0
+        self._zi = None
+
+    def process(self, audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Compute the envelope of a whole signal.
+
+        Args:
+            audio: Audio data, samples along the last axis
+            out: Optional preallocated output buffer (same shape as audio)
+
+        Returns:
+            Envelope with the same shape as audio
+        """
+        if self.mode == "exp_rms":
+            return exponential_rms(audio, self.window_size, out)
+        if self.mode == "peak":
+            return peak_hold(audio, self.window_size, out)
+        return sliding_rms(audio, self.window_size, out)
+
+    def process_block(self, block: np.ndarray, final: bool = False) -> np.ndarray:
+        """
+        Compute the envelope of the next block of a stream.
+
+        State is carried between calls, so feeding a signal block by block
+        gives the same envelope as process() on the whole signal. Centered
+        modes hold back the last `latency` samples until the following block
+        (or final=True) supplies their look-ahead.
+
+        Args:
+            block: Next audio samples, samples along the last axis
+            final: True for the last block of the stream
+
+        Returns:
+            Envelope values for the next samples whose window is complete
+        """
+        block = np.asarray(block)
+
+        if self.mode == "exp_rms":
+            if self._zi is None:
+                self._zi = np.zeros(block.shape[:-1] + (1,))
+            out = np.empty(block.shape, dtype=np.float32)
+            self._zi = _exponential_rms_block(block, self.window_size, self._zi, out)
+            return out
+
+        # Buffer = kept history + new block, covering [history_start, received)
+        if self._history is None or self._history.shape[-1] == 0:
+            buffer = block
+        else:
+            buffer = np.concatenate((self._history, block), axis=-1)
+        self._received += block.shape[-1]
+
+        stop = self._received if final else max(self._emitted, self._received - self.latency)
+        envelope = self.process(buffer)
+        result = envelope[..., self._emitted - self._history_start:stop - self._history_start]
+
+        # Keep the samples later windows still reach back to
+        look_back = self.window_size - 1 - self.latency
+        new_start = max(self._history_start, stop - look_back)
+        self._history = buffer[..., new_start - self._history_start:].copy()
+        self._history_start = new_start
+        self._emitted = stop
+
+        return result
+
@@ -0,0 +1,132 @@
+"""
+On-disk cache of gate envelopes.
+Lets threshold/attack/release/ratio retuning skip the envelope analysis.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes read per step when hashing input files
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class EnvelopeCache:
+    """
+    Downsampled float32 envelope sidecars with a size cap and LRU eviction.
+
+    store() returns the envelope exactly as a later load() expands it, so a
+    run that fills the cache gates the same way as the runs that read it.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_mb: float = 512, decimation: int = 32):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the sidecar files
+            max_size_mb: Total cache size before least recently used entries are evicted
+            decimation: Keep every Nth envelope sample (control-rate gates with a
+                        hop that is a multiple of this read exact values)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.decimation = max(1, int(decimation))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def file_hash(file_path: Path) -> str:
+        """Content hash of a file (cheaper than decoding it)."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def key(self, content_hash: str, window_size: int, mode: str) -> str:
+        """Cache key for an input file and detector configuration."""
+        return f"{content_hash[:32]}_{mode}_w{window_size}_d{self.decimation}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npy"
+
+    def load(self, key: str, length: int) -> Optional[np.ndarray]:
+        """
+        Load a cached envelope, expanded back to audio rate.
+
+        Args:
+            key: Cache key from key()
+            length: Number of audio samples
+
+        Returns:
+            Envelope of the given length, or None on a cache miss
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            decimated = np.load(path)
+            os.utime(path)  # Mark as recently used
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable envelope cache entry {path.name}: {e}")
+            return None
+
+        logger.debug(f"Envelope cache hit: {key}")
+        return self._expand(decimated, length)
+
+    def store(self, key: str, envelope: np.ndarray) -> np.ndarray:
+        """
+        Save a downsampled copy of an envelope and enforce the size cap.
+
+        Args:
+            key: Cache key from key()
+            envelope: Full-rate envelope
+
+        Returns:
+            The envelope as load() returns it (downsampled and interpolated back)
+        """
+        decimated = np.ascontiguousarray(envelope[::self.decimation], dtype=np.float32)
+        path = self._path(key)
+        temp_path = path.with_suffix('.tmp.npy')
+        try:
+            np.save(temp_path, decimated)
+            os.replace(temp_path, path)
+            logger.debug(f"Envelope cached: {key}")
+            self.evict()
+        except Exception as e:
+            logger.warning(f"Could not write envelope cache entry {path.name}: {e}")
+        return self._expand(decimated, len(envelope))
+
+    def _expand(self, decimated: np.ndarray, length: int) -> np.ndarray:
+        """Interpolate a downsampled envelope back to audio rate."""
+        positions = np.arange(len(decimated)) * self.decimation
+        return np.interp(np.arange(length), positions, decimated).astype(np.float32)
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size cap."""
+        entries = []
+        for path in self.cache_dir.glob('*.npy'):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                logger.debug(f"Evicted envelope cache entry: {path.name}")
+            except OSError:
+                continue
@@ -0,0 +1,126 @@
+"""
+Time-domain EQ filter bank.
+Band-limiting and speech boost as cascaded second-order sections (IIR),
+an alternative to the STFT round trip of the frequency filtering stage.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from scipy.signal import butter, sosfilt
+
+# Identity section (used when no filter is configured)
+_PASSTHROUGH = np.array([[1.0, 0.0, 0.0, 1.0, 0.0, 0.0]])
+
+
+def peaking_section(sample_rate: int, low: float, high: float, gain_db: float) -> np.ndarray:
+    """
+    Peaking EQ biquad (RBJ audio EQ cookbook) boosting the band [low, high].
+
+    Args:
+        sample_rate: Sample rate of the audio
+        low: Lower band edge in Hz
+        high: Upper band edge in Hz
+        gain_db: Gain at the band centre in dB
+
+    Returns:
+        One second-order section, shape (1, 6)
+    """
+    high = min(high, 0.45 * sample_rate)
+    center = np.sqrt(low * high)
+    octaves = np.log2(high / low)
+    amplitude = 10 ** (gain_db / 40)
+    w0 = 2 * np.pi * center / sample_rate
+    alpha = np.sin(w0) * np.sinh(np.log(2) / 2 * octaves * w0 / np.sin(w0))
+
+    b = np.array([1 + alpha * amplitude, -2 * np.cos(w0), 1 - alpha * amplitude])
+    a = np.array([1 + alpha / amplitude, -2 * np.cos(w0), 1 - alpha / amplitude])
+    return np.concatenate([b / a[0], a / a[0]])[np.newaxis]
+
+
+@lru_cache(maxsize=32)
+def design_filter_bank(sample_rate: int, low_cutoff: Optional[float] = None,
+                       high_cutoff: Optional[float] = None, boost_low: Optional[float] = None,
+                       boost_high: Optional[float] = None, boost_db: float = 0.0,
+                       order: int = 4) -> np.ndarray:
+    """
+    Second-order sections for high-pass, low-pass and peaking speech boost.
+
+    Designs are cached per (sample rate, parameters); the returned array
+    is shared and read-only.
+
+    Args:
+        sample_rate: Sample rate of the audio
+        low_cutoff: High-pass cutoff in Hz (None = no high-pass)
+        high_cutoff: Low-pass cutoff in Hz (None or above Nyquist = no low-pass)
+        boost_low: Lower edge of the boosted band in Hz
+        boost_high: Upper edge of the boosted band in Hz
+        boost_db: Boost in dB (0 = no boost)
+        order: Butterworth order of the high-pass and low-pass
+
+    Returns:
+        Filter sections, shape (n_sections, 6)
+    """
+    nyquist = sample_rate / 2
+    sections = []
+    if low_cutoff and low_cutoff < nyquist:
+        sections.append(butter(order, low_cutoff, btype="highpass", fs=sample_rate, output="sos"))
+    if high_cutoff and high_cutoff < nyquist:
+        sections.append(butter(order, high_cutoff, btype="lowpass", fs=sample_rate, output="sos"))
+    if boost_db and boost_low and boost_high and boost_low < min(boost_high, nyquist):
+        sections.append(peaking_section(sample_rate, boost_low, boost_high, boost_db))
+
+    sos = np.vstack(sections) if sections else _PASSTHROUGH.copy()
+    sos.setflags(write=False)
+    return sos
+
+
+class FilterBank:
+    """Cascade of second-order sections with filter state carried between blocks."""
+
+    def __init__(self, sos: np.ndarray):
+        """
+        Initialize the filter bank.
+
+        Args:
+            sos: Filter sections, e.g. from design_filter_bank()
+        """
+        self.sos = np.array(sos, dtype=np.float64)  # sosfilt needs a writable copy of the shared design
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the streaming state."""
+        self._zi = None
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Filter a whole signal (starting from rest).
+
+        Args:
+            audio: Audio data, samples along the last axis
+
+        Returns:
+            Filtered audio with the input's shape and dtype
+        """
+        audio = np.asarray(audio)
+        return sosfilt(self.sos, audio, axis=-1).astype(audio.dtype, copy=False)
+
+    def process_block(self, block: np.ndarray) -> np.ndarray:
+        """
+        Filter the next block of a stream.
+
+        Feeding a signal block by block gives the same output as process()
+        on the whole signal, with no latency.
+
+        Args:
+            block: Next audio samples, samples along the last axis
+
+        Returns:
+            Filtered block with the input's shape and dtype
+        """
+        block = np.asarray(block)
+        if self._zi is None:
+            self._zi = np.zeros((len(self.sos),) + block.shape[:-1] + (2,))
+        filtered, self._zi = sosfilt(self.sos, block, axis=-1, zi=self._zi)
+        return filtered.astype(block.dtype, copy=False)
@@ -0,0 +1,131 @@
+"""
+Stationary noise profiles.
+Quiet-region excerpts of a mic's recording, taken at the chain stage where
+they are applied, saved per courtroom mic and passed as the noise reference
+to TorchGate and noisereduce.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Frame length used to rank regions by level
+PROFILE_FRAME_SIZE = 2048
+
+# Frames at or below this RMS are treated as digital silence, not room noise
+SILENCE_RMS = 1e-7
+
+
+def profile_key(courtroom: str, mic: str, sample_rate: int, n_fft: int, stage_settings: dict) -> str:
+    """
+    Key of a saved profile.
+
+    Args:
+        courtroom: Courtroom name
+        mic: Microphone (channel) name
+        sample_rate: Sample rate of the audio
+        n_fft: STFT size of the noise reduction the profile feeds
+        stage_settings: Settings that shape the audio up to where the profile
+                        is taken (a change gives a new key)
+
+    Returns:
+        Key like "courtroom_mic1_sr44100_n1024_<settings digest>"
+    """
+    digest = hashlib.sha256(repr(sorted(stage_settings.items())).encode()).hexdigest()[:12]
+    return f"{courtroom}_{mic}_sr{sample_rate}_n{n_fft}_{digest}"
+
+
+def extract_noise_profile(audio: np.ndarray, sample_rate: int, percentile: float = 20.0,
+                          max_seconds: float = 10.0) -> Optional[np.ndarray]:
+    """
+    Collect the quietest regions of a recording into a noise reference.
+
+    The signal is split into frames; frames at or below the given RMS
+    percentile (ignoring digital silence) are kept in their original order,
+    evenly thinned to at most max_seconds.
+
+    Args:
+        audio: Audio data at the stage the profile is applied
+        sample_rate: Sample rate of the audio
+        percentile: Frame RMS percentile counted as noise floor
+        max_seconds: Maximum profile length
+
+    Returns:
+        Noise excerpt (float32), or None if the recording has no usable quiet regions
+    """
+    frame_count = len(audio) // PROFILE_FRAME_SIZE
+    if frame_count == 0:
+        return None
+
+    frames = np.asarray(audio[:frame_count * PROFILE_FRAME_SIZE], dtype=np.float32).reshape(frame_count, -1)
+    frame_rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+
+    audible = frame_rms > SILENCE_RMS
+    if not audible.any():
+        return None
+
+    quiet = np.flatnonzero(audible & (frame_rms <= np.percentile(frame_rms[audible], percentile)))
+    max_frames = max(1, int(max_seconds * sample_rate / PROFILE_FRAME_SIZE))
+    if len(quiet) > max_frames:
+        quiet = quiet[np.linspace(0, len(quiet) - 1, max_frames).astype(int)]
+
+    return frames[quiet].ravel()
+
+
+class NoiseProfileStore:
+    """Noise profiles saved on disk, keyed by profile_key()."""
+
+    def __init__(self, directory: Path):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding one .npz file per profile
+        """
+        self.directory = Path(directory)
+        self._loaded = {}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def load(self, key: str, sample_rate: int) -> Optional[np.ndarray]:
+        """
+        Load a profile.
+
+        Args:
+            key: Profile key from profile_key()
+            sample_rate: Sample rate of the audio it will be used with
+
+        Returns:
+            Noise excerpt, or None if no profile at this sample rate is saved under the key
+        """
+        if key not in self._loaded:
+            path = self._path(key)
+            if not path.exists():
+                return None
+            try:
+                with np.load(path) as data:
+                    self._loaded[key] = (data["noise"], int(data["sample_rate"]))
+                logger.info(f"Loaded noise profile: {key}")
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable noise profile {path.name}: {e}")
+                return None
+
+        noise, profile_rate = self._loaded[key]
+        if profile_rate != sample_rate:
+            logger.warning(f"Noise profile {key} was saved at {profile_rate} Hz, not {sample_rate} Hz; ignoring it")
+            return None
+        return noise
+
+    def save(self, key: str, noise: np.ndarray, sample_rate: int) -> None:
+        """Save a profile under a key (replacing any previous one)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        np.savez(self._path(key), noise=noise.astype(np.float32), sample_rate=sample_rate)
+        self._loaded[key] = (noise.astype(np.float32), sample_rate)
+        logger.info(f"Saved noise profile: {key} ({len(noise) / sample_rate:.1f}s)")
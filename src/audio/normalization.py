@@ -0,0 +1,146 @@
+"""
+Block-wise loudness normalization.
+Level statistics and gain are computed one block at a time, so normalizing
+needs no signal-sized temporaries, and files can be normalized from disk to
+disk in two streaming passes with constant memory.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Samples per block for level statistics, gain application and file streaming
+NORMALIZE_BLOCK_SIZE = 1 << 18
+
+
+class LevelStats:
+    """Running sum of squares (float64) and peak over blocks of a signal."""
+
+    def __init__(self):
+        self.sum_squares = 0.0
+        self.count = 0
+        self.peak = 0.0
+
+    def update(self, block: np.ndarray) -> None:
+        """Add the next block of samples."""
+        block = np.asarray(block, dtype=np.float64).ravel()
+        if block.size == 0:
+            return
+        self.sum_squares += float(np.dot(block, block))
+        self.count += block.size
+        self.peak = max(self.peak, float(block.max()), -float(block.min()))
+
+    @property
+    def rms(self) -> float:
+        return float(np.sqrt(self.sum_squares / self.count)) if self.count else 0.0
+
+
+def measure_levels(audio: np.ndarray, block_size: int = NORMALIZE_BLOCK_SIZE) -> LevelStats:
+    """RMS and peak of a signal, block by block."""
+    stats = LevelStats()
+    flat = np.asarray(audio).reshape(-1)
+    for start in range(0, flat.size, block_size):
+        stats.update(flat[start:start + block_size])
+    return stats
+
+
+def normalization_scale(rms: float, peak: float, target_db: float, max_amplitude: float) -> Optional[float]:
+    """
+    Gain bringing a signal to target_db RMS without its peak exceeding max_amplitude.
+
+    Returns:
+        Scale factor, or None for a silent signal
+    """
+    if rms <= 0:
+        return None
+    scale = 10 ** (target_db / 20) / rms
+    if peak * scale > max_amplitude:
+        scale = max_amplitude / peak
+    return scale
+
+
+def scale_clip_blocks(audio: np.ndarray, scale: float, limit: float, out: Optional[np.ndarray] = None,
+                      block_size: int = NORMALIZE_BLOCK_SIZE) -> np.ndarray:
+    """
+    Multiply by scale and clip to [-limit, limit], block by block.
+
+    Args:
+        audio: Audio data
+        scale: Gain
+        limit: Clip level
+        out: Output buffer (may be audio itself; None = new array)
+        block_size: Samples per block
+
+    Returns:
+        Scaled audio
+    """
+    audio = np.ascontiguousarray(audio)
+    out = np.empty_like(audio) if out is None else out
+    flat_in, flat_out = audio.reshape(-1), out.reshape(-1)
+    for start in range(0, flat_in.size, block_size):
+        block = flat_out[start:start + block_size]
+        np.multiply(flat_in[start:start + block_size], scale, out=block, casting="same_kind")
+        np.clip(block, -limit, limit, out=block)
+    return out
+
+
+def normalize_file(input_path: Path, output_path: Path, target_db: float, max_amplitude: float,
+                   block_size: int = NORMALIZE_BLOCK_SIZE) -> Optional[float]:
+    """
+    Normalize an audio file to a mono output file in two streaming passes.
+
+    The first pass accumulates the level statistics, the second applies the
+    gain and writes each block, so memory stays at one block whatever the
+    file length. Multichannel input is averaged to mono, as librosa.load does.
+    The output is written to a temporary file next to output_path and renamed
+    over it only once complete, so a failure never leaves a partial file.
+
+    Args:
+        input_path: Input file (any format soundfile can read)
+        output_path: Output file (format from the extension)
+        target_db: Target RMS level in dB
+        max_amplitude: Peak limit
+        block_size: Frames per block
+
+    Returns:
+        Applied scale factor (None = silent input, copied unchanged)
+
+    Raises:
+        sf.LibsndfileError, RuntimeError, TypeError: if soundfile cannot read
+            the input or write the output format
+    """
+    import soundfile as sf
+
+    def mono_blocks(source):
+        for block in source.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+            yield block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+
+    with sf.SoundFile(str(input_path)) as source:
+        stats = LevelStats()
+        for block in mono_blocks(source):
+            stats.update(block)
+
+        scale = normalization_scale(stats.rms, stats.peak, target_db, max_amplitude)
+        if scale is None:
+            logger.warning(f"{Path(input_path).name} has zero RMS, skipping normalization")
+
+        # Same extension, so soundfile picks the same output format
+        output_path = Path(output_path)
+        temp_path = output_path.with_name(f"{output_path.stem}.partial{output_path.suffix}")
+        source.seek(0)
+        try:
+            with sf.SoundFile(str(temp_path), "w", samplerate=source.samplerate, channels=1) as sink:
+                for block in mono_blocks(source):
+                    sink.write(block if scale is None else scale_clip_blocks(block, scale, max_amplitude))
+            os.replace(temp_path, output_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    return scale
@@ -0,0 +1,95 @@
+"""
+Segment-level repair of non-finite processing output.
+Only the regions where an engine produced NaN/Inf are rerun through another
+engine and spliced back in with crossfades, instead of redoing the file.
+"""
+
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def nonfinite_regions(audio: np.ndarray, merge_gap: int = 0) -> List[Tuple[int, int]]:
+    """
+    Sample ranges [start, stop) containing NaN or Inf.
+
+    Args:
+        audio: Audio (samples, or channels x samples; a sample is bad if any channel is)
+        merge_gap: Regions separated by fewer finite samples than this are merged
+
+    Returns:
+        Sorted, non-overlapping regions
+    """
+    bad = ~np.isfinite(audio)
+    if bad.ndim > 1:
+        bad = bad.any(axis=tuple(range(bad.ndim - 1)))
+    if not bad.any():
+        return []
+
+    edges = np.flatnonzero(np.diff(bad.astype(np.int8), prepend=0, append=0))
+    regions = []
+    for start, stop in zip(edges[::2], edges[1::2]):
+        if regions and start - regions[-1][1] < merge_gap:
+            regions[-1] = (regions[-1][0], int(stop))
+        else:
+            regions.append((int(start), int(stop)))
+    return regions
+
+
+def repair_nonfinite(processed: np.ndarray, original: np.ndarray, sample_rate: int,
+                     engine: Callable[[np.ndarray], np.ndarray], padding_seconds: float = 1.0,
+                     crossfade_ms: float = 20.0) -> Tuple[np.ndarray, float]:
+    """
+    Replace the non-finite regions of processed output with another engine's output.
+
+    Each region is widened by the crossfade on both sides; the engine is run
+    on the original audio around it plus padding_seconds of context, and the
+    result is crossfaded in over the widened edges.
+
+    Args:
+        processed: Engine output (samples); may be shorter than original
+        original: Input the output was produced from (samples)
+        sample_rate: Sample rate of the audio
+        engine: Function mapping an original-audio segment to processed audio of the same length
+        padding_seconds: Context given to the engine on each side of a region
+        crossfade_ms: Crossfade length at each splice
+
+    Returns:
+        Tuple of (repaired audio, seconds of audio repaired)
+    """
+    n = len(processed)
+    fade = max(1, int(crossfade_ms * sample_rate / 1000))
+    pad = int(padding_seconds * sample_rate)
+
+    # Merge regions whose crossfades would overlap (a fade must start on finite samples)
+    regions = nonfinite_regions(processed, merge_gap=2 * fade)
+    if not regions:
+        return processed, 0.0
+
+    repaired = processed.copy()
+    repaired_samples = 0
+    for bad_start, bad_stop in regions:
+        splice_start, splice_stop = max(0, bad_start - fade), min(n, bad_stop + fade)
+        seg_start, seg_stop = max(0, splice_start - pad), min(len(original), splice_stop + pad)
+
+        replacement = engine(original[seg_start:seg_stop])[splice_start - seg_start:splice_stop - seg_start]
+
+        # Crossfade from the processed output into the replacement and back
+        weight = np.ones(splice_stop - splice_start, dtype=np.float32)
+        fade_in = bad_start - splice_start
+        fade_out = splice_stop - bad_stop
+        weight[:fade_in] = (np.arange(fade_in) + 0.5) / max(1, fade_in)
+        if fade_out:
+            weight[-fade_out:] = ((np.arange(fade_out) + 0.5) / fade_out)[::-1]
+
+        current = np.nan_to_num(repaired[splice_start:splice_stop], nan=0.0, posinf=0.0, neginf=0.0)
+        repaired[splice_start:splice_stop] = weight * replacement + (1 - weight) * current
+        repaired_samples += bad_stop - bad_start
+
+    seconds = repaired_samples / sample_rate
+    logger.info(f"Repaired {seconds:.2f}s of non-finite output in {len(regions)} region(s)")
+    return repaired, seconds
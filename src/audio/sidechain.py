@@ -0,0 +1,125 @@
+"""
+Cross-channel sidechain gate for mic bleed reduction.
+Each channel is gated by how loud it is relative to the other channels.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from .envelope import EnvelopeDetector
+from .filter_bank import FilterBank
+from .gate_kernel import ramp_gate_control
+
+
+def loudest_other_level(envelopes: np.ndarray) -> np.ndarray:
+    """
+    For every channel, the loudest envelope among all the *other* channels.
+
+    Only the two loudest levels per sample are tracked, so the cost is
+    O(channels * samples) instead of comparing every pair of channels.
+
+    Args:
+        envelopes: Shared envelope matrix (channels, samples)
+
+    Returns:
+        Matrix of the same shape with the loudest competing level per channel
+    """
+    first = np.zeros(envelopes.shape[-1], dtype=envelopes.dtype)
+    second = np.zeros_like(first)
+    lower = np.empty_like(first)
+
+    # Running top-two over channels
+    for envelope in envelopes:
+        np.minimum(first, envelope, out=lower)
+        np.maximum(second, lower, out=second)
+        np.maximum(first, envelope, out=first)
+
+    # A channel holding the maximum competes with the runner-up, others with the maximum
+    return np.where(envelopes >= first, second, first)
+
+
+def sidechain_gate_control(envelopes: np.ndarray, dominance_db: float,
+                           attack_samples: int, release_samples: int, initial=0.0) -> np.ndarray:
+    """
+    Gate control per channel that opens only while the channel dominates.
+
+    Args:
+        envelopes: Shared envelope matrix (channels, samples)
+        dominance_db: How far (dB) a channel must be above the loudest other
+                      channel for its gate to open (negative allows overlap)
+        attack_samples: Samples for a full open ramp
+        release_samples: Samples for a full close ramp
+        initial: Control value before the first sample (scalar or one per channel)
+
+    Returns:
+        Gate control matrix in [0, 1] (channels, samples)
+    """
+    competing = loudest_other_level(envelopes)
+    competing *= 10 ** (dominance_db / 20)
+    dominant = envelopes > competing
+
+    return ramp_gate_control(dominant, attack_samples, release_samples, initial)
+
+
+class CrossChannelGateStream:
+    """Cross-channel gate state for one session, carried across blocks."""
+
+    def __init__(self, sample_rate: int, total_samples: int, dominance_db: float, floor_db: float,
+                 attack_ms: float, release_ms: float, envelope_mode: str = "rms",
+                 sos: Optional[np.ndarray] = None):
+        """
+        Initialize gate state.
+
+        total_samples sets the envelope window, so feeding a session block
+        by block gives the same result as gating it in one call.
+
+        Args:
+            sample_rate: Sample rate of the audio
+            total_samples: Session length in samples
+            dominance_db: How far (dB) a channel must be above the loudest other channel to open
+            floor_db: Level of a channel while another channel dominates
+            attack_ms: Open ramp time
+            release_ms: Close ramp time
+            envelope_mode: Level detector ("rms", "exp_rms" or "peak")
+            sos: Optional band-limiting filter sections applied after the gate
+        """
+        self.dominance_db = dominance_db
+        self.floor = 10 ** (floor_db / 20)
+        self.attack_samples = int(attack_ms * sample_rate / 1000)
+        self.release_samples = int(release_ms * sample_rate / 1000)
+        self.detector = EnvelopeDetector(envelope_mode, min(1024, total_samples // 10))
+        self.filter_bank = None if sos is None else FilterBank(sos)
+
+        self.control = 0.0     # Gate state per channel (every channel starts closed)
+        self.pending = None    # Audio waiting for its envelope
+
+    def process(self, block: np.ndarray, final: bool = False) -> np.ndarray:
+        """
+        Gate the next (channels, samples) block of the session.
+
+        Output lags the input by the envelope look-ahead; final=True flushes
+        everything still pending.
+        """
+        if self.pending is None or self.pending.shape[-1] == 0:
+            self.pending = block
+        else:
+            self.pending = np.concatenate((self.pending, block), axis=-1)
+
+        # Open while dominant; closed channels keep the floor level
+        envelopes = self.detector.process_block(block, final)
+        control = sidechain_gate_control(envelopes, self.dominance_db, self.attack_samples,
+                                         self.release_samples, self.control)
+        if control.shape[-1]:
+            self.control = control[:, -1].copy()
+        control *= 1.0 - self.floor
+        control += self.floor
+
+        ready = control.shape[-1]
+        gated = (self.pending[:, :ready] * control).astype(np.float32)
+        self.pending = self.pending[:, ready:]
+
+        # Band-limit every channel (rumble and hiss carry most of the bleed)
+        if self.filter_bank is not None:
+            gated = self.filter_bank.process_block(gated)
+        return gated
@@ -0,0 +1,191 @@
+"""
+Fast nonstationary spectral gate.
+Same algorithm as TorchGate's nonstationary mode, computed in cache-sized
+blocks of STFT frames: the per-bin moving mean comes from running sums and
+the mask smoothing from separable box filters, and the finished mask is
+applied to the spectrogram in place.
+"""
+
+from typing import Optional
+
+import torch
+import torch.nn.functional as F
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# STFT frames per block (mask working set of a block stays in CPU cache)
+FRAMES_PER_BLOCK = 256
+
+
+def _triangle(n_grad: int) -> torch.Tensor:
+    """Triangular smoothing window spanning n_grad steps on each side (as TorchGate builds it)."""
+    rise = torch.linspace(0, 1, n_grad + 2)[:-1]
+    fall = torch.linspace(1, 0, n_grad + 2)
+    return torch.cat([rise, fall])[1:-1]
+
+
+def _box_sum(x: torch.Tensor, width: int, dim: int) -> torch.Tensor:
+    """Valid running sum of width along dim (float64 accumulation)."""
+    sums = torch.cumsum(x, dim=dim, dtype=torch.float64)
+    sums = torch.cat([torch.zeros_like(sums.narrow(dim, 0, 1)), sums], dim=dim)
+    return sums.narrow(dim, width, sums.shape[dim] - width) - sums.narrow(dim, 0, sums.shape[dim] - width)
+
+
+class NonstationarySpectralGate(torch.nn.Module):
+    """
+    Nonstationary spectral gate with the same parameters and output as
+    TorchGate(nonstationary=True), up to float rounding.
+
+    TorchGate makes several full passes over the spectrogram (moving-mean
+    convolution, sigmoid, 2-D smoothing convolution), which is memory-bound
+    for long recordings. Here each block of frames runs the whole mask
+    pipeline while it is in cache: the moving mean over
+    n_movemean_nonstationary frames is a running-sum difference, and the
+    triangular smoothing filter is applied as two box filters per axis
+    (a triangle is a box convolved with itself).
+    """
+
+    nonstationary = True
+
+    def __init__(self, sr: int, n_fft: int = 1024, win_length: Optional[int] = None,
+                 hop_length: Optional[int] = None, n_thresh_nonstationary: float = 1.3,
+                 temp_coeff_nonstationary: float = 0.1, n_movemean_nonstationary: int = 20,
+                 freq_mask_smooth_hz: Optional[float] = 500, time_mask_smooth_ms: Optional[float] = 50,
+                 prop_decrease: float = 1.0, **unused):
+        """
+        Initialize the gate.
+
+        Args:
+            sr: Sample rate of the audio
+            n_fft: STFT size
+            win_length: STFT window length (None = n_fft)
+            hop_length: STFT hop (None = win_length // 4)
+            n_thresh_nonstationary: Slowness ratio above which a bin counts as signal
+            temp_coeff_nonstationary: Sigmoid temperature of the mask
+            n_movemean_nonstationary: Frames in the moving mean
+            freq_mask_smooth_hz: Mask smoothing across frequency (None = none)
+            time_mask_smooth_ms: Mask smoothing across time (None = none)
+            prop_decrease: Proportion of the noise removed (0.0 to 1.0)
+            **unused: Stationary-mode TorchGate settings (ignored)
+        """
+        super().__init__()
+        self.sr = sr
+        self.n_fft = n_fft
+        self.win_length = n_fft if win_length is None else win_length
+        self.hop_length = self.win_length // 4 if hop_length is None else hop_length
+        self.n_thresh_nonstationary = n_thresh_nonstationary
+        self.temp_coeff_nonstationary = temp_coeff_nonstationary
+        self.n_movemean_nonstationary = n_movemean_nonstationary
+        self.prop_decrease = prop_decrease
+
+        # Smoothing half-widths in bins and frames (TorchGate's n_grad_freq / n_grad_time)
+        self.n_grad_freq = 1 if freq_mask_smooth_hz is None else int(freq_mask_smooth_hz / (sr / (n_fft / 2)))
+        self.n_grad_time = (1 if time_mask_smooth_ms is None
+                            else int(time_mask_smooth_ms / ((self.hop_length / sr) * 1000)))
+        if self.n_grad_freq < 1 or self.n_grad_time < 1:
+            raise ValueError("Mask smoothing is shorter than one STFT bin/frame")
+
+        self.register_buffer("window", torch.hann_window(self.win_length))
+        if self.n_grad_freq == 1 and self.n_grad_time == 1:
+            self.smoothing_filter = None
+        else:
+            # 2-D equivalent, for callers that smooth with conv2d (e.g. the chunked runner)
+            v_f, v_t = _triangle(self.n_grad_freq), _triangle(self.n_grad_time)
+            smoothing_filter = torch.outer(v_f, v_t)[None, None]
+            self.register_buffer("smoothing_filter", smoothing_filter / smoothing_filter.sum())
+
+    def _moving_mean(self, X_abs: torch.Tensor) -> torch.Tensor:
+        """Zero-padded centred moving mean along frames (TorchGate's conv1d "same", via running sums)."""
+        n = self.n_movemean_nonstationary
+        left = (n - 1) // 2
+        padded = F.pad(X_abs, (left, n - 1 - left))
+        return (_box_sum(padded, n, -1) / n).to(X_abs.dtype)
+
+    def _nonstationary_mask(self, X_abs: torch.Tensor) -> torch.Tensor:
+        """Sigmoid mask from each bin's level relative to its moving mean."""
+        X_smoothed = self._moving_mean(X_abs)
+        slowness_ratio = (X_abs - X_smoothed) / X_smoothed
+        return torch.sigmoid((slowness_ratio - self.n_thresh_nonstationary) / self.temp_coeff_nonstationary)
+
+    def _smooth(self, sig_mask: torch.Tensor) -> torch.Tensor:
+        """
+        Triangular smoothing of a (batch, freq, frames) mask: "same" across
+        frequency (zero padded) and "valid" across time (callers supply
+        n_grad_time frames of context on each side).
+
+        The triangle spanning n_grad steps either side is a box of
+        n_grad + 1 convolved with itself, so each axis takes two running sums.
+        """
+        if self.smoothing_filter is None:
+            return sig_mask
+
+        freq_width, time_width = self.n_grad_freq + 1, self.n_grad_time + 1
+        out = F.pad(sig_mask, (0, 0, self.n_grad_freq, self.n_grad_freq))
+        out = _box_sum(_box_sum(out, freq_width, -2), freq_width, -2)
+        out = _box_sum(_box_sum(out, time_width, -1), time_width, -1)
+        return (out / (freq_width * time_width) ** 2).to(sig_mask.dtype)
+
+    def _block_mask(self, X: torch.Tensor, start: int, stop: int) -> torch.Tensor:
+        """Final (smoothed, prop_decrease applied) mask for frames [start, stop)."""
+        frames = X.shape[-1]
+        n = self.n_movemean_nonstationary
+        left, right = (n - 1) // 2, n - 1 - (n - 1) // 2
+        context = self.n_grad_time if self.smoothing_filter is not None else 0
+
+        # Mask frames [m_start, m_stop) feed the smoothing; frames outside the signal are zero
+        m_start, m_stop = start - context, stop + context
+        lo, hi = max(0, m_start - left), min(frames, m_stop + right)
+        X_abs = F.pad(X[..., lo:hi].abs(), (lo - (m_start - left), (m_stop + right) - hi))
+
+        X_smoothed = (_box_sum(X_abs, n, -1) / n).to(X_abs.dtype)
+        X_abs = X_abs[..., left:left + X_smoothed.shape[-1]]
+        sig_mask = torch.sigmoid(((X_abs - X_smoothed) / X_smoothed - self.n_thresh_nonstationary)
+                                 / self.temp_coeff_nonstationary)
+        sig_mask = self.prop_decrease * (sig_mask - 1.0) + 1.0
+
+        # Zero the mask outside the signal (TorchGate's conv2d pads the mask with zeros)
+        if m_start < 0:
+            sig_mask[..., :-m_start] = 0.0
+        if m_stop > frames:
+            sig_mask[..., frames - m_stop:] = 0.0
+
+        return self._smooth(sig_mask)
+
+    @torch.no_grad()
+    def forward(self, x: torch.Tensor, xn: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """
+        Denoise x (batch, samples).
+
+        Args:
+            x: Audio tensor (batch, samples)
+            xn: Ignored (nonstationary gating needs no noise clip)
+
+        Returns:
+            Denoised audio tensor (length rounded down to the hop, like TorchGate)
+        """
+        if x.shape[-1] < self.win_length * 2:
+            raise ValueError(f"x must be longer than {self.win_length * 2} samples")
+
+        X = torch.stft(x, n_fft=self.n_fft, hop_length=self.hop_length, win_length=self.win_length,
+                       window=self.window, center=True, pad_mode="constant", return_complex=True)
+
+        # Mask each block from the unmasked spectrogram, then apply it in place once
+        # no later block reads those frames (lag covers the moving mean and smoothing context)
+        frames = X.shape[-1]
+        context = (self.n_movemean_nonstationary - 1) // 2 + self.n_grad_time
+        lag = 1 + -(-context // FRAMES_PER_BLOCK)
+        masks = []
+        for start in range(0, frames, FRAMES_PER_BLOCK):
+            stop = min(frames, start + FRAMES_PER_BLOCK)
+            masks.append((start, stop, self._block_mask(X, start, stop)))
+            if len(masks) > lag:
+                done_start, done_stop, done_mask = masks.pop(0)
+                X[..., done_start:done_stop] *= done_mask
+        for done_start, done_stop, done_mask in masks:
+            X[..., done_start:done_stop] *= done_mask
+
+        y = torch.istft(X, n_fft=self.n_fft, hop_length=self.hop_length, win_length=self.win_length,
+                        window=self.window, center=True)
+        return y.to(dtype=x.dtype)
@@ -0,0 +1,128 @@
+"""
+Shared-STFT spectral processing.
+Spectral stages contribute multiplicative masks to one STFT of the signal,
+so a chain of them costs a single forward/inverse transform pair.
+"""
+
+from typing import Callable, List, Optional
+
+import numpy as np
+import torch
+from noisereduce.torchgate.utils import amp_to_db
+
+from .chunked_torchgate import stationary_mask, TOP_DB
+from .spectral_gate import NonstationarySpectralGate, FRAMES_PER_BLOCK
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# A mask stage maps the complex STFT (batch, freq, frames) to a mask broadcastable against it
+MaskStage = Callable[[torch.Tensor], torch.Tensor]
+
+
+class SpectralGraph:
+    """One STFT, the product of every stage's mask, one ISTFT."""
+
+    def __init__(self, n_fft: int, hop_length: int, win_length: Optional[int] = None):
+        """
+        Initialize the graph.
+
+        Args:
+            n_fft: STFT size shared by all stages
+            hop_length: STFT hop
+            win_length: STFT window length (None = n_fft)
+        """
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.win_length = n_fft if win_length is None else win_length
+        self.stages: List[MaskStage] = []
+
+    @classmethod
+    def for_torchgate(cls, tg: torch.nn.Module) -> "SpectralGraph":
+        """Graph on a TorchGate module's STFT grid (plain, compiled or the fast nonstationary gate)."""
+        tg = getattr(tg, "_orig_mod", tg)
+        return cls(tg.n_fft, tg.hop_length, tg.win_length)
+
+    def add_mask(self, stage: MaskStage) -> "SpectralGraph":
+        """Add a stage computing its mask from the (unmasked) spectrogram."""
+        self.stages.append(stage)
+        return self
+
+    def add_gain(self, gain: np.ndarray) -> "SpectralGraph":
+        """Add a fixed gain per frequency bin (n_fft // 2 + 1 values)."""
+        if len(gain) != self.n_fft // 2 + 1:
+            raise ValueError(f"Expected {self.n_fft // 2 + 1} bin gains, got {len(gain)}")
+        gain = torch.as_tensor(np.asarray(gain, dtype=np.float32))
+        return self.add_mask(lambda X: gain.to(X.device).unsqueeze(-1))
+
+    @torch.inference_mode()
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Run every stage on x (batch, samples).
+
+        Returns:
+            Processed audio (length rounded down to the hop, like TorchGate)
+        """
+        window = torch.hann_window(self.win_length, device=x.device)
+        X = torch.stft(x, n_fft=self.n_fft, hop_length=self.hop_length, win_length=self.win_length,
+                       window=window, center=True, pad_mode="constant", return_complex=True)
+
+        # Every mask sees the unmasked spectrogram, so the masks are combined before applying any
+        mask = None
+        for stage in self.stages:
+            stage_mask = stage(X)
+            mask = stage_mask if mask is None else mask * stage_mask
+        if mask is not None:
+            X *= mask
+
+        y = torch.istft(X, n_fft=self.n_fft, hop_length=self.hop_length, win_length=self.win_length,
+                        window=window, center=True)
+        return y.to(dtype=x.dtype)
+
+
+def torchgate_mask(tg: torch.nn.Module, xn: Optional[torch.Tensor] = None) -> MaskStage:
+    """
+    Mask stage computing the same smoothed mask TorchGate.forward applies.
+
+    The mask is computed eagerly from the module's settings; for a compiled
+    module that means its original (uncompiled) code, so callers that want
+    the compiled kernels should run the module itself instead.
+
+    Args:
+        tg: Configured TorchGate module (plain or NonstationarySpectralGate)
+        xn: Optional noise clip for stationary statistics
+
+    Returns:
+        Mask stage for a SpectralGraph on the module's STFT grid
+    """
+    tg = getattr(tg, "_orig_mod", tg)
+
+    def stage(X: torch.Tensor) -> torch.Tensor:
+        if isinstance(tg, NonstationarySpectralGate):
+            # Blocked mask computation (same values as the full-spectrogram one)
+            frames = X.shape[-1]
+            return torch.cat([tg._block_mask(X, start, min(frames, start + FRAMES_PER_BLOCK))
+                              for start in range(0, frames, FRAMES_PER_BLOCK)], dim=-1)
+
+        X_abs = X.abs()
+        if tg.nonstationary:
+            sig_mask = tg.prop_decrease * (tg._nonstationary_mask(X_abs) - 1.0) + 1.0
+            if tg.smoothing_filter is not None:
+                sig_mask = torch.nn.functional.conv2d(
+                    sig_mask.unsqueeze(1), tg.smoothing_filter.to(sig_mask.dtype), padding="same"
+                ).squeeze(1)
+            return sig_mask
+
+        X_db = 20 * torch.log10(X_abs + torch.finfo(torch.float64).eps)
+        floor_db = (X_db.amax(-1) - TOP_DB).unsqueeze(-1)
+        if xn is None:
+            std_noise, mean_noise = torch.std_mean(torch.maximum(X_db, floor_db), dim=-1)
+        else:
+            XN = torch.stft(xn, n_fft=tg.n_fft, hop_length=tg.hop_length, win_length=tg.win_length,
+                            window=torch.hann_window(tg.win_length, device=xn.device), center=True,
+                            pad_mode="constant", return_complex=True)
+            std_noise, mean_noise = torch.std_mean(amp_to_db(XN).to(X_db.dtype), dim=-1)
+        noise_thresh = mean_noise + std_noise * tg.n_std_thresh_stationary
+        return stationary_mask(X_abs, floor_db, noise_thresh, tg.prop_decrease, tg.smoothing_filter)
+
+    return stage
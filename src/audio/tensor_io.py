@@ -0,0 +1,30 @@
+"""
+Conversions between numpy audio and torch tensors.
+Avoids copying the signal when its layout already allows sharing memory.
+"""
+
+import numpy as np
+import torch
+
+
+def audio_to_tensor(audio: np.ndarray, device) -> torch.Tensor:
+    """
+    Torch tensor for audio, sharing memory with the array when possible.
+
+    Contiguous float32 input is wrapped without a copy; other dtypes or
+    strides are converted with a single copy. Moving to a non-CPU device
+    always copies once.
+
+    Args:
+        audio: Audio data as numpy array
+        device: Torch device for the tensor
+
+    Returns:
+        float32 tensor with the same shape as audio
+    """
+    return torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32)).to(device)
+
+
+def tensor_to_audio(tensor: torch.Tensor) -> np.ndarray:
+    """Numpy array for a tensor (no copy for CPU tensors)."""
+    return tensor.detach().cpu().numpy()
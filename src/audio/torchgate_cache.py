@@ -0,0 +1,78 @@
+"""
+Process-wide cache of configured TorchGate modules.
+Batch runs reuse one module per (sample rate, settings, device) instead of
+building and moving a new one for every file.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+import torch
+
+from ..utils.logger import get_logger
+from .compiled_torchgate import compile_torchgate
+
+logger = get_logger(__name__)
+
+_modules: Dict[tuple, torch.nn.Module] = {}
+_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+
+def get_torchgate(sample_rate: int, device, compiled: bool = False, compile_cache_dir: Optional[str] = None,
+                  engine: str = "torchgate", **settings: Any) -> torch.nn.Module:
+    """
+    Return a TorchGate module for the given configuration, building it once.
+
+    Args:
+        sample_rate: Sample rate of the audio
+        device: Torch device (or device string) the module runs on
+        compiled: Compile the module with torch.compile (and warm it up) when it is built
+        compile_cache_dir: Directory for the compiled-kernel cache
+        engine: "torchgate" (noisereduce TorchGate) or "fast_nonstationary" (NonstationarySpectralGate)
+        **settings: TorchGate keyword arguments (prop_decrease, nonstationary, ...)
+
+    Returns:
+        Configured TorchGate module on the requested device
+    """
+    key = (int(sample_rate), tuple(sorted(settings.items())), str(torch.device(device)), bool(compiled), engine)
+
+    with _lock:
+        module = _modules.get(key)
+        if module is not None:
+            _stats["hits"] += 1
+            return module
+
+        if engine == "fast_nonstationary":
+            from .spectral_gate import NonstationarySpectralGate as TorchGate
+        else:
+            # Import here to avoid issues if noisereduce is not available
+            from noisereduce.torchgate import TorchGate
+
+        module = TorchGate(sr=sample_rate, **settings).to(device)
+        if compiled:
+            module = compile_torchgate(module, sample_rate, compile_cache_dir)
+        _modules[key] = module
+        _stats["misses"] += 1
+        logger.debug(f"Built {engine} module: sr={sample_rate}, device={key[2]}")
+        return module
+
+
+def torchgate_cache_info() -> Dict[str, Any]:
+    """Cache statistics: hits, misses, hit_rate and number of cached modules."""
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+            "size": len(_modules),
+        }
+
+
+def clear_torchgate_cache() -> None:
+    """Drop all cached modules (e.g. to free GPU memory) and reset the statistics."""
+    with _lock:
+        _modules.clear()
+        _stats["hits"] = 0
+        _stats["misses"] = 0
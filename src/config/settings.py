@@ -58,6 +58,11 @@ OUTPUT_BIT_DEPTH = CONFIG.get("OUTPUT_BIT_DEPTH", 16)
 CHUNK_SIZE = CONFIG.get("CHUNK_SIZE_MB", 1) * 1024 * 1024  # Convert MB to bytes
 FORCE_CPU_PROCESSING = CONFIG.get("FORCE_CPU_PROCESSING", False)
 MAX_MEMORY_USAGE_GB = CONFIG.get("MAX_MEMORY_USAGE_GB", 4)
+TORCHGATE_COMPILE = CONFIG.get("TORCHGATE_COMPILE", False)
+TORCHGATE_COMPILE_CACHE_DIR = CONFIG.get("TORCHGATE_COMPILE_CACHE_DIR", None)
+PARALLEL_JOBS = CONFIG.get("PARALLEL_JOBS", 1)
+THREADS_PER_JOB = CONFIG.get("THREADS_PER_JOB", None)
+PROCESSING_BACKEND = CONFIG.get("PROCESSING_BACKEND", "numpy")  # "numpy" or "torch" (tensor-resident chain)
 
 # Logging settings
 LOG_FILE = f"{LOGS_DIR}/audio_processing.log"
@@ -76,12 +81,15 @@ SKIP_EXISTING_FILES = CONFIG.get("SKIP_EXISTING_FILES", False)
 # Audio validation settings
 VALIDATE_AUDIO_OUTPUT = CONFIG.get("VALIDATE_AUDIO_OUTPUT", True)
 MAX_AUDIO_AMPLITUDE = CONFIG.get("MAX_AUDIO_AMPLITUDE", 1.0)
+REPAIR_PADDING_SECONDS = CONFIG.get("REPAIR_PADDING_SECONDS", 1.0)
+REPAIR_CROSSFADE_MS = CONFIG.get("REPAIR_CROSSFADE_MS", 20)
 
 # Noise gate settings
 ENABLE_NOISE_GATE = CONFIG.get("ENABLE_NOISE_GATE", True)
 NOISE_GATE_THRESHOLD_DB = CONFIG.get("NOISE_GATE_THRESHOLD_DB", -40.0)
 NOISE_GATE_ATTACK_MS = CONFIG.get("NOISE_GATE_ATTACK_MS", 5)
 NOISE_GATE_RELEASE_MS = CONFIG.get("NOISE_GATE_RELEASE_MS", 100)
+GATE_ENVELOPE_MODE = CONFIG.get("GATE_ENVELOPE_MODE", "rms")
 
 # Pre-normalization noise gate settings
 ENABLE_PRE_NORMALIZATION_GATE = CONFIG.get("ENABLE_PRE_NORMALIZATION_GATE", False)
@@ -89,13 +97,42 @@ PRE_GATE_THRESHOLD_DB = CONFIG.get("PRE_GATE_THRESHOLD_DB", -40.0)
 PRE_GATE_ATTACK_MS = CONFIG.get("PRE_GATE_ATTACK_MS", 5)
 PRE_GATE_RELEASE_MS = CONFIG.get("PRE_GATE_RELEASE_MS", 100)
 
+# Automatic gate threshold settings (replace the *_THRESHOLD_DB values when enabled)
+AUTO_GATE_THRESHOLD = CONFIG.get("AUTO_GATE_THRESHOLD", False)
+AUTO_GATE_NOISE_PERCENTILE = CONFIG.get("AUTO_GATE_NOISE_PERCENTILE", 10.0)
+AUTO_GATE_SPEECH_PERCENTILE = CONFIG.get("AUTO_GATE_SPEECH_PERCENTILE", 95.0)
+AUTO_GATE_THRESHOLD_POSITION = CONFIG.get("AUTO_GATE_THRESHOLD_POSITION", 0.3)
+
+# Noise profile settings (stationary noise reference reused across files)
+ENABLE_NOISE_PROFILES = CONFIG.get("ENABLE_NOISE_PROFILES", False)
+NOISE_PROFILE_DIR = CONFIG.get("NOISE_PROFILE_DIR", "noise_profiles")
+NOISE_PROFILE_COURTROOM = CONFIG.get("NOISE_PROFILE_COURTROOM", "courtroom")
+NOISE_PROFILE_PERCENTILE = CONFIG.get("NOISE_PROFILE_PERCENTILE", 20.0)
+NOISE_PROFILE_SECONDS = CONFIG.get("NOISE_PROFILE_SECONDS", 10.0)
+
+# Multi-channel / mic bleed settings
+MULTI_CHANNEL_MODE = CONFIG.get("MULTI_CHANNEL_MODE", True)
+ENABLE_MIC_BLEED_REDUCTION = CONFIG.get("ENABLE_MIC_BLEED_REDUCTION", True)
+ENABLE_CROSS_CHANNEL_NOISE_REFERENCE = CONFIG.get("ENABLE_CROSS_CHANNEL_NOISE_REFERENCE", False)
+SESSION_FILE_PATTERN = CONFIG.get("SESSION_FILE_PATTERN", r"^(?P<session>.*?)[_ -]*(?:ch|mic|channel|track)[_ -]*\d+$")
+MIC_BLEED_DOMINANCE_DB = CONFIG.get("MIC_BLEED_DOMINANCE_DB", 0.0)
+MIC_BLEED_FLOOR_DB = CONFIG.get("MIC_BLEED_FLOOR_DB", -20.0)
+MIC_BLEED_ATTACK_MS = CONFIG.get("MIC_BLEED_ATTACK_MS", 10)
+MIC_BLEED_RELEASE_MS = CONFIG.get("MIC_BLEED_RELEASE_MS", 400)
+MIC_BLEED_FREQUENCY_FILTER = CONFIG.get("MIC_BLEED_FREQUENCY_FILTER", True)
+MIC_BLEED_LOW_FREQ_CUTOFF = CONFIG.get("MIC_BLEED_LOW_FREQ_CUTOFF", 80)
+MIC_BLEED_HIGH_FREQ_CUTOFF = CONFIG.get("MIC_BLEED_HIGH_FREQ_CUTOFF", 8000)
+
 # Frequency filtering settings
-ENABLE_FREQUENCY_FILTERING = CONFIG.get("ENABLE_FREQUENCY_FILTERING", False)
+ENABLE_FREQUENCY_FILTERING = CONFIG.get("ENABLE_FREQUENCY_FILTERING", True)
 FREQ_LOW_CUTOFF = CONFIG.get("FREQ_LOW_CUTOFF", 100)
 FREQ_HIGH_CUTOFF = CONFIG.get("FREQ_HIGH_CUTOFF", 7000)
 FREQ_SPEECH_BOOST_LOW = CONFIG.get("FREQ_SPEECH_BOOST_LOW", 500)
 FREQ_SPEECH_BOOST_HIGH = CONFIG.get("FREQ_SPEECH_BOOST_HIGH", 3000)
 FREQ_SPEECH_BOOST_AMOUNT = CONFIG.get("FREQ_SPEECH_BOOST_AMOUNT", 2.0)
+FREQ_FILTER_BLOCK_SECONDS = CONFIG.get("FREQ_FILTER_BLOCK_SECONDS", 30.0)
+FREQ_FILTER_MODE = CONFIG.get("FREQ_FILTER_MODE", "stft")  # "stft" (per-bin gain) or "iir" (filter bank)
+SHARED_STFT_STAGES = CONFIG.get("SHARED_STFT_STAGES", True)  # Filter at TorchGate's STFT size; off with TORCHGATE_COMPILE
 
 # Speech detection settings
 ENABLE_SPEECH_DETECTION = CONFIG.get("ENABLE_SPEECH_DETECTION", False)
@@ -4,19 +4,65 @@ Main processor class that orchestrates the audio processing workflow.
 
 import logging
 import time
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+import soundfile as sf
 from tqdm import tqdm
 
 from ..config.settings import (
     DEFAULT_INPUT_DIR, DEFAULT_OUTPUT_DIR, SUPPORTED_FORMATS,
     OUTPUT_FILE_PREFIX
 )
-from ..utils.file_utils import ensure_directory_exists, get_audio_files, create_output_filename
+from ..utils.file_utils import ensure_directory_exists, get_audio_files, create_output_filename, group_sessions
 from ..audio.processor import AudioProcessor
+from ..audio.torchgate_cache import torchgate_cache_info
+from ..utils.parallel import run_parallel
 
 logger = logging.getLogger(__name__)
 
+# Samples per channel read and gated at a time in cross-channel sessions
+SESSION_BLOCK_SIZE = 1 << 16
+
+def _build_audio_processor(force_cpu: bool) -> AudioProcessor:
+    """Worker initializer: one AudioProcessor per worker process."""
+    return AudioProcessor(force_cpu=force_cpu)
+
+def _process_file_task(audio_processor: AudioProcessor, item: tuple) -> bool:
+    """Worker task: process one (input_file, output_file, strength) item."""
+    input_file, output_file, noise_reduction_strength = item
+    return audio_processor.process_audio_file(input_file, output_file, noise_reduction_strength)
+
+def _open_channel(audio_processor: AudioProcessor, audio_file: Path,
+                  stack: ExitStack) -> Tuple[Callable[[int], np.ndarray], int, int]:
+    """
+    Open one session channel for block reading.
+    
+    Files soundfile can read are streamed (mixed to mono like librosa.load);
+    other formats are loaded whole and read from memory.
+    
+    Returns:
+        Tuple of (read(frames) -> mono float32 block, total frames, sample_rate)
+    """
+    try:
+        source = stack.enter_context(sf.SoundFile(str(audio_file)))
+    except (sf.LibsndfileError, RuntimeError, TypeError):
+        audio, sample_rate = audio_processor.load_audio(audio_file)
+        position = [0]
+        
+        def read(frames: int) -> np.ndarray:
+            block = audio[position[0]:position[0] + frames]
+            position[0] += len(block)
+            return block
+        
+        return read, len(audio), sample_rate
+    
+    def read(frames: int) -> np.ndarray:
+        return source.read(frames, dtype='float32', always_2d=True).mean(axis=1)
+    
+    return read, source.frames, source.samplerate
+
 class CourtroomAudioProcessor:
     """Main processor class for courtroom audio files."""
     
@@ -65,12 +111,15 @@ class CourtroomAudioProcessor:
             input_file, output_file, noise_reduction_strength
         )
     
-    def process_all_files(self, noise_reduction_strength: float = 0.5) -> Tuple[int, int]:
+    def process_all_files(self, noise_reduction_strength: float = 0.5, jobs: Optional[int] = None,
+                          threads_per_job: Optional[int] = None) -> Tuple[int, int]:
         """
         Process all audio files in the input directory.
         
         Args:
             noise_reduction_strength: Strength of noise reduction (0.0 to 1.0)
+            jobs: Worker processes (None = PARALLEL_JOBS)
+            threads_per_job: Torch threads per worker (None = THREADS_PER_JOB, or cores // jobs)
             
         Returns:
             Tuple of (successful_count, total_count)
@@ -87,21 +136,137 @@ class CourtroomAudioProcessor:
         for file in audio_files:
             logger.info(f"  - {file.name}")
         
+        from ..config.settings import PARALLEL_JOBS, THREADS_PER_JOB
+        jobs = PARALLEL_JOBS if jobs is None else jobs
+        threads_per_job = THREADS_PER_JOB if threads_per_job is None else threads_per_job
+        
         successful = 0
         total = len(audio_files)
         
+        # Cross-channel gating needs every channel of a session together
+        from ..config.settings import ENABLE_MIC_BLEED_REDUCTION, ENABLE_CROSS_CHANNEL_NOISE_REFERENCE
+        if ENABLE_MIC_BLEED_REDUCTION and ENABLE_CROSS_CHANNEL_NOISE_REFERENCE:
+            sessions = group_sessions(audio_files)
+            multi_channel = [session for session in sessions if len(session) > 1]
+            if multi_channel and jobs > 1:
+                logger.warning(f"Cross-channel sessions are processed in this process; "
+                               f"jobs={jobs} only applies to files outside a session")
+            for session in multi_channel:
+                session_successful, _ = self.process_session(session, noise_reduction_strength)
+                successful += session_successful
+            audio_files = [session[0] for session in sessions if len(session) == 1]
+        
+        items = [(audio_file, self.output_dir / create_output_filename(audio_file.name, OUTPUT_FILE_PREFIX),
+                  noise_reduction_strength)
+                 for audio_file in audio_files]
+        
+        if jobs > 1 and items:
+            # Worker processes, each with its own AudioProcessor and torch thread budget
+            from ..config.settings import FORCE_CPU_PROCESSING
+            results = run_parallel(_process_file_task, items, _build_audio_processor, (FORCE_CPU_PROCESSING,),
+                                   jobs, threads_per_job, desc="Processing audio files")
+            for audio_file, (completed, result) in zip(audio_files, results):
+                if completed and result:
+                    successful += 1
+                elif not completed:
+                    logger.error(f"❌ Worker failed on {audio_file.name}: {result}")
+            return successful, total
+        
         # Process files with progress bar
-        for audio_file in tqdm(audio_files, desc="Processing audio files"):
+        for audio_file, output_file, _ in tqdm(items, desc="Processing audio files"):
+            if self.process_single_file(audio_file, output_file, noise_reduction_strength):
+                successful += 1
+        
+        return successful, total
+    
+    def process_session(self, audio_files: List[Path], 
+                        noise_reduction_strength: float = 0.5) -> Tuple[int, int]:
+        """
+        Process files as the microphone channels of one session.
+        The channels are cross-channel gated together, block by block,
+        before the usual per-file processing.
+        
+        Args:
+            audio_files: Audio files, one per microphone channel
+            noise_reduction_strength: Strength of noise reduction (0.0 to 1.0)
+            
+        Returns:
+            Tuple of (successful_count, total_count)
+        """
+        total = len(audio_files)
+        
+        with ExitStack() as stack:
+            channels = []
+            for audio_file in audio_files:
+                try:
+                    channels.append((audio_file,) + _open_channel(self.audio_processor, audio_file, stack))
+                except Exception as e:
+                    logger.error(f"❌ Could not load {audio_file.name}: {e}")
+            
+            sample_rates = {sample_rate for *_, sample_rate in channels}
+            gated_channels = None
+            if len(channels) > 1 and len(sample_rates) == 1:
+                sample_rate = sample_rates.pop()
+                logger.info(f"Applying cross-channel gate to {len(channels)} channels")
+                try:
+                    gated_channels = self._gate_session(channels, sample_rate)
+                except Exception as e:
+                    logger.error(f"Error applying cross-channel gate: {e}")
+            else:
+                logger.warning("Cross-channel gate needs at least two channels with the same sample rate, skipping it")
+        
+        successful = 0
+        for index, (audio_file, *_) in enumerate(tqdm(channels, desc="Processing audio files")):
             output_filename = create_output_filename(
                 audio_file.name, OUTPUT_FILE_PREFIX
             )
             output_file = self.output_dir / output_filename
             
-            if self.process_single_file(audio_file, output_file, noise_reduction_strength):
+            if gated_channels is None:
+                processed = self.process_single_file(audio_file, output_file, noise_reduction_strength)
+            else:
+                logger.info(f"Processing: {audio_file.name}")
+                processed = self.audio_processor.process_audio(gated_channels[index], sample_rate, output_file,
+                                                               noise_reduction_strength, profile_file=audio_file)
+            if processed:
                 successful += 1
         
         return successful, total
     
+    def _gate_session(self, channels: list, sample_rate: int) -> List[np.ndarray]:
+        """
+        Cross-channel gate open session channels in blocks of SESSION_BLOCK_SIZE.
+        Shorter channels are zero-filled to the longest one while gating.
+        
+        Args:
+            channels: (audio_file, read, frames, sample_rate) per channel
+            sample_rate: Sample rate shared by the channels
+            
+        Returns:
+            Gated audio per channel, each at its own length
+        """
+        lengths = [frames for _, _, frames, _ in channels]
+        total_samples = max(lengths)
+        stream = self.audio_processor.cross_channel_gate_stream(sample_rate, total_samples)
+        gated_channels = [np.empty(length, dtype=np.float32) for length in lengths]
+        
+        written = 0
+        for start in range(0, total_samples, SESSION_BLOCK_SIZE):
+            size = min(SESSION_BLOCK_SIZE, total_samples - start)
+            block = np.zeros((len(channels), size), dtype=np.float32)
+            for row, (_, read, _, _) in zip(block, channels):
+                data = read(size)
+                row[:len(data)] = data
+            
+            # The stream lags by its envelope look-ahead until the final block
+            gated = stream.process(block, final=start + size >= total_samples)
+            for row, gated_channel in zip(gated, gated_channels):
+                span = gated_channel[written:written + gated.shape[-1]]
+                span[:] = row[:len(span)]
+            written += gated.shape[-1]
+        
+        return gated_channels
+    
     def show_processing_summary(self, successful: int, total: int, 
                               processing_time: float) -> None:
         """
@@ -119,6 +284,10 @@ class CourtroomAudioProcessor:
         logger.info(f"Successfully processed: {successful}")
         logger.info(f"Failed to process: {total - successful}")
         logger.info(f"Total processing time: {processing_time:.2f} seconds")
+        
+        cache_info = torchgate_cache_info()
+        logger.info(f"TorchGate module cache: {cache_info['hits']} hits, {cache_info['misses']} builds "
+                    f"({cache_info['hit_rate']:.0%} hit rate)")
         logger.info(f"Cleaned files saved to: {self.output_dir}")
         
         if successful > 0:
@@ -3,11 +3,12 @@ File utility functions for the Courtroom Audio Processor.
 """
 
 import os
+import re
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import logging
 
-from ..config.settings import SUPPORTED_FORMATS
+from ..config.settings import SUPPORTED_FORMATS, SESSION_FILE_PATTERN
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,47 @@ def get_audio_files(input_directory: Path) -> List[Path]:
     logger.info(f"Found {len(audio_files)} audio files to process")
     return audio_files
 
+def group_sessions(audio_files: List[Path], pattern: Optional[str] = None) -> List[List[Path]]:
+    """
+    Group files into recording sessions.
+    
+    Files are grouped by the 'session' group of pattern, matched on the file
+    stem ("hearing_mic1" and "hearing_mic2" -> "hearing"). Files that do not
+    match form a session of their own. Sessions keep file order.
+    
+    Args:
+        audio_files: Audio files to group
+        pattern: Regular expression with a 'session' group (None = SESSION_FILE_PATTERN)
+        
+    Returns:
+        List of sessions, each a list of files
+    """
+    pattern = SESSION_FILE_PATTERN if pattern is None else pattern
+    sessions = {}
+    for audio_file in audio_files:
+        match = re.match(pattern, audio_file.stem, re.IGNORECASE)
+        key = match.group("session") if match else audio_file.stem
+        sessions.setdefault(key, []).append(audio_file)
+    return list(sessions.values())
+
+def session_channel(audio_file: Path, pattern: Optional[str] = None) -> str:
+    """
+    Channel (mic) name of a session file: the part of the stem after the
+    'session' group of pattern ("hearing_mic3" -> "mic3").
+    
+    Args:
+        audio_file: Audio file of a session
+        pattern: Regular expression with a 'session' group (None = SESSION_FILE_PATTERN)
+        
+    Returns:
+        Lower-case channel name, or the whole stem if the pattern does not match
+    """
+    pattern = SESSION_FILE_PATTERN if pattern is None else pattern
+    match = re.match(pattern, audio_file.stem, re.IGNORECASE)
+    if not match:
+        return audio_file.stem
+    return audio_file.stem[match.end("session"):].strip("_ -").lower()
+
 def format_file_size(bytes_size: int) -> str:
     """
     Format file size in human-readable format.
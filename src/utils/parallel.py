@@ -0,0 +1,124 @@
+"""
+Process-pool batch execution.
+Splits the machine's cores between worker processes, each with its own
+torch thread budget and its own long-lived processor object.
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from tqdm import tqdm
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Per-worker state built once by the pool initializer (e.g. an AudioProcessor)
+_worker_state: Any = None
+
+
+def thread_budget(jobs: Optional[int], threads_per_job: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Worker count and torch threads per worker for the available cores.
+
+    Args:
+        jobs: Requested worker processes (None or < 1 = 1)
+        threads_per_job: Requested torch threads per worker (None = split the cores evenly)
+
+    Returns:
+        Tuple of (jobs, threads_per_job)
+    """
+    cores = os.cpu_count() or 1
+    jobs = max(1, jobs or 1)
+    if threads_per_job is None or threads_per_job < 1:
+        threads_per_job = max(1, cores // jobs)
+    if jobs * threads_per_job > cores:
+        logger.warning(f"{jobs} jobs x {threads_per_job} threads oversubscribes {cores} cores")
+    return jobs, threads_per_job
+
+
+def _log_config() -> Tuple[int, Optional[str]]:
+    """This process's root log level and format (handed to spawned workers)."""
+    root = logging.getLogger()
+    formats = [handler.formatter._fmt for handler in root.handlers if handler.formatter is not None]
+    return root.getEffectiveLevel(), formats[0] if formats else None
+
+
+def _init_worker(threads: int, log_level: int, log_format: Optional[str], initializer: Callable,
+                 initargs: tuple) -> None:
+    """Pool initializer: configure logging, set the torch thread budget and build the worker state."""
+    global _worker_state
+    import torch
+
+    # Spawned workers start with unconfigured logging; match the parent's console output
+    logging.basicConfig(level=log_level, format=log_format or logging.BASIC_FORMAT, stream=sys.stdout, force=True)
+    torch.set_num_threads(threads)
+    _worker_state = initializer(*initargs)
+
+
+def _run_task(task: Callable, item: Any) -> Any:
+    """Run one task against this worker's state."""
+    return task(_worker_state, item)
+
+
+def run_parallel(task: Callable, items: Sequence, initializer: Callable, initargs: tuple = (),
+                 jobs: Optional[int] = None, threads_per_job: Optional[int] = None,
+                 desc: Optional[str] = None) -> List[Tuple[bool, Any]]:
+    """
+    Run task(state, item) for every item on a pool of worker processes.
+
+    Each worker calls initializer(*initargs) once and reuses the returned
+    state for all its items. With a single job everything runs in this
+    process (with the torch thread budget restored afterwards). task and
+    initializer must be module-level functions (workers are spawned, not
+    forked, so torch's thread pools start clean); workers log at this
+    process's level and format.
+
+    Args:
+        task: Function (state, item) -> result
+        items: Work items
+        initializer: Function building the per-worker state
+        initargs: Arguments for the initializer
+        jobs: Worker processes
+        threads_per_job: Torch threads per worker (None = cores // jobs)
+        desc: Progress bar label (None = no progress bar)
+
+    Returns:
+        (True, result) or (False, error message) per item, in input order
+    """
+    jobs, threads = thread_budget(min(jobs or 1, max(1, len(items))), threads_per_job)
+
+    if jobs == 1:
+        import torch
+
+        previous_threads = torch.get_num_threads()
+        torch.set_num_threads(threads)
+        try:
+            state = initializer(*initargs)
+            results = []
+            for item in tqdm(items, desc=desc, disable=desc is None):
+                try:
+                    results.append((True, task(state, item)))
+                except Exception as e:
+                    results.append((False, str(e) or type(e).__name__))
+            return results
+        finally:
+            torch.set_num_threads(previous_threads)
+
+    logger.info(f"Running {len(items)} items on {jobs} workers x {threads} torch threads")
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                             initializer=_init_worker, initargs=(threads, *_log_config(), initializer, initargs)) as pool:
+        futures = [pool.submit(_run_task, task, item) for item in items]
+
+        results = []
+        for future in tqdm(futures, desc=desc, disable=desc is None):
+            try:
+                results.append((True, future.result()))
+            except Exception as e:
+                results.append((False, str(e) or type(e).__name__))
+        return results